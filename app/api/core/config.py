@@ -2,6 +2,7 @@ from pydantic_settings import BaseSettings
 from functools import lru_cache
 from dotenv import load_dotenv
 import os
+from typing import Optional
 
 load_dotenv()
 
@@ -12,10 +13,122 @@ class Settings(BaseSettings):
     GIPHY_API_KEY: str = os.getenv("GIPHY_API_KEY")
     UPSTASH_REDIS_REST_URL: str = os.getenv("UPSTASH_REDIS_REST_URL")
     UPSTASH_REDIS_REST_TOKEN: str = os.getenv("UPSTASH_REDIS_REST_TOKEN")
+    TENOR_API_URL: str = os.getenv("TENOR_API_URL", "https://tenor.googleapis.com/v2")
+    GIPHY_API_URL: str = os.getenv("GIPHY_API_URL", "https://api.giphy.com/v1")
+    REDDIT_OAUTH_URL: str = os.getenv("REDDIT_OAUTH_URL", "https://oauth.reddit.com")
+    REDDIT_URL: str = os.getenv("REDDIT_URL", "https://www.reddit.com")
     
     CACHE_EXPIRY: int = int(os.getenv("CACHE_EXPIRY", 3600))
+    TENOR_CACHE_TTL: int = int(os.getenv("TENOR_CACHE_TTL", os.getenv("CACHE_EXPIRY", 3600)))
+    GIPHY_CACHE_TTL: int = int(os.getenv("GIPHY_CACHE_TTL", os.getenv("CACHE_EXPIRY", 3600)))
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", 30))
     MAX_RETRIES: int = int(os.getenv("MAX_RETRIES", 3))
+    REQUEST_BUDGET: float = float(os.getenv("REQUEST_BUDGET", 8))
+    HEDGE_DELAY: float = float(os.getenv("HEDGE_DELAY", 1.5))
+    PLANNER_MAX_CALLS: int = int(os.getenv("PLANNER_MAX_CALLS", 6))
+    PLANNER_SAFETY: float = float(os.getenv("PLANNER_SAFETY", 1.5))
+    PLANNER_YIELD_FLOOR: float = float(os.getenv("PLANNER_YIELD_FLOOR", 0.2))
+    PLANNER_YIELD_RECOVERY: float = float(os.getenv("PLANNER_YIELD_RECOVERY", 60))
+    DEBUG_HEADERS: bool = os.getenv("DEBUG_HEADERS", "false").lower() == "true"
+    PROVIDER_TIMEOUT: float = float(os.getenv("PROVIDER_TIMEOUT", 5))
+    REDDIT_LISTING_TIMEOUT: float = float(os.getenv("REDDIT_LISTING_TIMEOUT", 15))
+    CACHE_BATCH_WINDOW_MS: float = float(os.getenv("CACHE_BATCH_WINDOW_MS", 2))
+    CACHE_BATCH_MAX: int = int(os.getenv("CACHE_BATCH_MAX", 50))
+    LOCAL_CACHE_SIZE: int = int(os.getenv("LOCAL_CACHE_SIZE", 1024))
+    LOCAL_CACHE_TTL: float = float(os.getenv("LOCAL_CACHE_TTL", 30))
+    LOCAL_CACHE_NEGATIVE_TTL: float = float(os.getenv("LOCAL_CACHE_NEGATIVE_TTL", 5))
+    LOCAL_CACHE_STALE_TTL: float = float(os.getenv("LOCAL_CACHE_STALE_TTL", 60))
+    LOCAL_SEEN_SIZE: int = int(os.getenv("LOCAL_SEEN_SIZE", 512))
+    LOCAL_SEEN_TTL: float = float(os.getenv("LOCAL_SEEN_TTL", 30))
+
+    HTTP_POOL_LIMIT: int = int(os.getenv("HTTP_POOL_LIMIT", 100))
+    HTTP_POOL_LIMIT_PER_HOST: int = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", 20))
+    HTTP_KEEPALIVE_TIMEOUT: float = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", 30))
+    HTTP_DNS_CACHE_TTL: int = int(os.getenv("HTTP_DNS_CACHE_TTL", 300))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+    HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", 10))
+
+    REDDIT_LISTING_LIMIT: int = int(os.getenv("REDDIT_LISTING_LIMIT", 100))
+    REDDIT_LISTING_TTL: int = int(os.getenv("REDDIT_LISTING_TTL", 600))
+    REDDIT_REFRESH_INTERVAL: int = int(os.getenv("REDDIT_REFRESH_INTERVAL", 300))
+
+    BREAKER_WINDOW: int = int(os.getenv("BREAKER_WINDOW", 20))
+    BREAKER_FAILURE_RATE: float = float(os.getenv("BREAKER_FAILURE_RATE", 0.5))
+    BREAKER_MIN_CALLS: int = int(os.getenv("BREAKER_MIN_CALLS", 5))
+    BREAKER_OPEN_SECONDS: float = float(os.getenv("BREAKER_OPEN_SECONDS", 30))
+    ADMIN_TOKEN: Optional[str] = os.getenv("ADMIN_TOKEN")
+
+    TENOR_RATE_LIMIT: float = float(os.getenv("TENOR_RATE_LIMIT", 5))
+    TENOR_RATE_BURST: int = int(os.getenv("TENOR_RATE_BURST", 10))
+    GIPHY_RATE_LIMIT: float = float(os.getenv("GIPHY_RATE_LIMIT", 5))
+    GIPHY_RATE_BURST: int = int(os.getenv("GIPHY_RATE_BURST", 10))
+    REDDIT_RATE_LIMIT: float = float(os.getenv("REDDIT_RATE_LIMIT", 1.5))
+    REDDIT_RATE_BURST: int = int(os.getenv("REDDIT_RATE_BURST", 5))
+    RATE_LIMIT_MAX_WAIT: float = float(os.getenv("RATE_LIMIT_MAX_WAIT", 0.5))
+    RATE_LIMIT_REDIS: bool = os.getenv("RATE_LIMIT_REDIS", "false").lower() == "true"
+
+    TENOR_FOREGROUND_TIMEOUT: float = float(os.getenv("TENOR_FOREGROUND_TIMEOUT", 2.5))
+    TENOR_RETRY_ATTEMPTS: int = int(os.getenv("TENOR_RETRY_ATTEMPTS", 3))
+    TENOR_RETRY_BASE_DELAY: float = float(os.getenv("TENOR_RETRY_BASE_DELAY", 2))
+    TENOR_RETRY_MAX_DELAY: float = float(os.getenv("TENOR_RETRY_MAX_DELAY", 60))
+    GIPHY_FOREGROUND_TIMEOUT: float = float(os.getenv("GIPHY_FOREGROUND_TIMEOUT", 2.5))
+    GIPHY_RETRY_ATTEMPTS: int = int(os.getenv("GIPHY_RETRY_ATTEMPTS", 3))
+    GIPHY_RETRY_BASE_DELAY: float = float(os.getenv("GIPHY_RETRY_BASE_DELAY", 2))
+    GIPHY_RETRY_MAX_DELAY: float = float(os.getenv("GIPHY_RETRY_MAX_DELAY", 60))
+    REDDIT_FOREGROUND_TIMEOUT: float = float(os.getenv("REDDIT_FOREGROUND_TIMEOUT", 3))
+    REDDIT_RETRY_ATTEMPTS: int = int(os.getenv("REDDIT_RETRY_ATTEMPTS", 2))
+    REDDIT_RETRY_BASE_DELAY: float = float(os.getenv("REDDIT_RETRY_BASE_DELAY", 5))
+    REDDIT_RETRY_MAX_DELAY: float = float(os.getenv("REDDIT_RETRY_MAX_DELAY", 120))
+    RETRY_QUEUE_MAX: int = int(os.getenv("RETRY_QUEUE_MAX", 256))
+
+    INBOUND_RATE_LIMIT: float = float(os.getenv("INBOUND_RATE_LIMIT", 10))
+    INBOUND_RATE_BURST: int = int(os.getenv("INBOUND_RATE_BURST", 20))
+    INBOUND_API_KEYS: str = os.getenv("INBOUND_API_KEYS", "")
+    MAX_CONCURRENT_REQUESTS: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", 64))
+    MAX_QUEUED_REQUESTS: int = int(os.getenv("MAX_QUEUED_REQUESTS", 128))
+    QUEUE_TIMEOUT: float = float(os.getenv("QUEUE_TIMEOUT", 2))
+
+    CATALOG_ENABLED: bool = os.getenv("CATALOG_ENABLED", "true").lower() == "true"
+    CATALOG_PATH: str = os.getenv("CATALOG_PATH", "catalog.db")
+    CATALOG_HARVEST_INTERVAL: float = float(os.getenv("CATALOG_HARVEST_INTERVAL", 60))
+    CATALOG_HARVEST_BATCH: int = int(os.getenv("CATALOG_HARVEST_BATCH", 6))
+    PROVIDER_FIXTURES: Optional[str] = os.getenv("PROVIDER_FIXTURES")
+    CATEGORIES_PATH: Optional[str] = os.getenv("CATEGORIES_PATH")
+    CATEGORIES_RELOAD_INTERVAL: float = float(os.getenv("CATEGORIES_RELOAD_INTERVAL", 10))
+
+    PAGED_HARVEST: bool = os.getenv("PAGED_HARVEST", "true").lower() == "true"
+    TENOR_PAGE_SIZE: int = int(os.getenv("TENOR_PAGE_SIZE", 50))
+    GIPHY_PAGE_SIZE: int = int(os.getenv("GIPHY_PAGE_SIZE", 50))
+    PAGE_BUFFER_MAX: int = int(os.getenv("PAGE_BUFFER_MAX", 200))
+
+    POOL_ENABLED: bool = os.getenv("POOL_ENABLED", "true").lower() == "true"
+    POOL_LOW_WATERMARK: int = int(os.getenv("POOL_LOW_WATERMARK", 10))
+    POOL_HIGH_WATERMARK: int = int(os.getenv("POOL_HIGH_WATERMARK", 40))
+    POOL_REFILL_CONCURRENCY: int = int(os.getenv("POOL_REFILL_CONCURRENCY", 4))
+    POOL_REDIS_BACKED: bool = os.getenv("POOL_REDIS_BACKED", "false").lower() == "true"
+    POOL_REDIS_EXPIRY: int = int(os.getenv("POOL_REDIS_EXPIRY", 3600))
+
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_LOOP_INTERVAL: float = float(os.getenv("METRICS_LOOP_INTERVAL", 0.5))
+
+    WORKERS: int = int(os.getenv("WORKERS", 1))
+    LEADER_LOCK: str = os.getenv("LEADER_LOCK", "file")
+    LEADER_LOCK_PATH: str = os.getenv("LEADER_LOCK_PATH", "leader.lock")
+    LEADER_LOCK_TTL: int = int(os.getenv("LEADER_LOCK_TTL", 15))
+    LEADER_CHECK_INTERVAL: float = float(os.getenv("LEADER_CHECK_INTERVAL", 5))
+    SHARED_POOL_PATH: str = os.getenv("SHARED_POOL_PATH", "shared_pool.mmap")
+    SHARED_POOL_MAX_KEYS: int = int(os.getenv("SHARED_POOL_MAX_KEYS", 256))
+    SHARED_POOL_SLOTS: int = int(os.getenv("SHARED_POOL_SLOTS", 128))
+    SHARED_POOL_SLOT_SIZE: int = int(os.getenv("SHARED_POOL_SLOT_SIZE", 512))
+    SHARED_POOL_PUBLISH_INTERVAL: float = float(os.getenv("SHARED_POOL_PUBLISH_INTERVAL", 0.25))
+    CATALOG_REFRESH_INTERVAL: float = float(os.getenv("CATALOG_REFRESH_INTERVAL", 30))
+
+    DEDUP_PHASH: bool = os.getenv("DEDUP_PHASH", "false").lower() == "true"
+    DEDUP_PHASH_DISTANCE: int = int(os.getenv("DEDUP_PHASH_DISTANCE", 6))
+    DEDUP_PHASH_CACHE_SIZE: int = int(os.getenv("DEDUP_PHASH_CACHE_SIZE", 20000))
+    DEDUP_PHASH_CONCURRENCY: int = int(os.getenv("DEDUP_PHASH_CONCURRENCY", 4))
+    DEDUP_PHASH_MAX_BYTES: int = int(os.getenv("DEDUP_PHASH_MAX_BYTES", 4 * 1024 * 1024))
+    DEDUP_PHASH_TTL: int = int(os.getenv("DEDUP_PHASH_TTL", 7 * 86400))
     
     class Config:
         case_sensitive = True
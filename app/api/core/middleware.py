@@ -0,0 +1,109 @@
+import asyncio
+import json
+import math
+from collections import OrderedDict
+from typing import Optional
+from .config import get_settings
+from ..services.ratelimit import TokenBucket
+
+settings = get_settings()
+
+MAX_TRACKED_CLIENTS = 10000
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware limiting each client to a token bucket and capping
+    concurrent requests behind a bounded queue. Clients are keyed by IP, or
+    by X-API-Key when the key is in the INBOUND_API_KEYS allow-list. Excess
+    requests are rejected early with 429/503 and a Retry-After header.
+    """
+
+    def __init__(
+        self,
+        app,
+        rate: float = settings.INBOUND_RATE_LIMIT,
+        burst: int = settings.INBOUND_RATE_BURST,
+        max_concurrency: int = settings.MAX_CONCURRENT_REQUESTS,
+        max_queue: int = settings.MAX_QUEUED_REQUESTS,
+        queue_timeout: float = settings.QUEUE_TIMEOUT,
+        path_prefix: str = "/api/",
+        api_keys: str = settings.INBOUND_API_KEYS,
+    ):
+        self.app = app
+        self.rate = rate
+        self.burst = burst
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.path_prefix = path_prefix
+        self.api_keys = frozenset(key.strip().encode() for key in api_keys.split(",") if key.strip())
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+        self._queued = 0
+
+    def _client_id(self, scope) -> str:
+        for name, value in scope.get("headers", []):
+            # Unknown keys fall through to the IP so rotating them cannot mint new buckets
+            if name == b"x-api-key" and value in self.api_keys:
+                return f"key:{value.decode('latin-1')}"
+        client = scope.get("client")
+        return f"ip:{client[0]}" if client else "ip:unknown"
+
+    def _check_rate(self, client_id: str) -> float:
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[client_id] = bucket
+            if len(self._buckets) > MAX_TRACKED_CLIENTS:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client_id)
+        return bucket.try_acquire()
+
+    async def _reject(self, send, status: int, detail: str, retry_after: float) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(math.ceil(retry_after), 1)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _enter(self) -> Optional[str]:
+        """Take a concurrency slot, returning a rejection reason when shedding"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return None
+        if self._queued >= self.max_queue:
+            return "Server busy"
+        self._queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            return None
+        except asyncio.TimeoutError:
+            return "Server busy, queue timeout"
+        finally:
+            self._queued -= 1
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope.get("path", "").startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        wait = self._check_rate(self._client_id(scope))
+        if wait > 0:
+            await self._reject(send, 429, "Rate limit exceeded", wait)
+            return
+
+        reason = await self._enter()
+        if reason:
+            await self._reject(send, 503, reason, self.queue_timeout)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._semaphore.release()
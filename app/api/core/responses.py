@@ -0,0 +1,21 @@
+import orjson
+from typing import Any, Dict
+from ..models.gif import GifRecord
+from fastapi.responses import Response
+
+class FastJSONResponse(Response):
+    """
+    JSON response encoded with orjson. Routes return it directly so FastAPI
+    skips response_model validation; payloads are built from records the
+    services have already normalized. Pre-encoded bytes are sent as-is.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content)
+
+def gif_payload(gif: GifRecord, category: str) -> Dict:
+    """Public shape of a GIF, matching GifResponse"""
+    return gif.to_payload(category)
@@ -0,0 +1,86 @@
+import hashlib
+import sys
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional
+import orjson
+
+ROW_FIELDS = ("url", "source", "category", "size", "width", "height", "preview", "title", "subreddit")
+
+@dataclass(frozen=True, slots=True)
+class GifRecord:
+    """Normalized GIF emitted by every provider and passed through the whole pipeline"""
+    id: str
+    url: str
+    source: str
+    category: str
+    size: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    preview: Optional[str] = None
+    title: Optional[str] = None
+    subreddit: Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        url: str,
+        source: str,
+        category: str = "all",
+        size: Optional[int] = None,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        preview: Optional[str] = None,
+        title: Optional[str] = None,
+        subreddit: Optional[str] = None,
+    ) -> "GifRecord":
+        """Build a record, precomputing its ID and interning the repeated strings"""
+        return cls(
+            id=hashlib.md5(url.encode()).hexdigest(),
+            url=url,
+            source=sys.intern(source),
+            category=sys.intern(category),
+            size=size,
+            width=width,
+            height=height,
+            preview=preview,
+            title=title,
+            subreddit=sys.intern(subreddit) if subreddit else subreddit,
+        )
+
+    @property
+    def dims(self) -> Optional[List[Optional[int]]]:
+        if self.width is None and self.height is None:
+            return None
+        return [self.width, self.height]
+
+    def with_category(self, category: str) -> "GifRecord":
+        if category == self.category:
+            return self
+        return replace(self, category=sys.intern(category))
+
+    def to_payload(self, category: Optional[str] = None) -> Dict:
+        """Public shape of a GIF, matching GifResponse"""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "size": self.size,
+            "dims": self.dims,
+            "source": self.source,
+            "category": self.category if category is None else category,
+        }
+
+    def to_row(self) -> list:
+        """Compact positional form for cache storage, without trailing empty fields"""
+        row = [getattr(self, field) for field in ROW_FIELDS]
+        while row and row[-1] is None:
+            row.pop()
+        return row
+
+    @classmethod
+    def from_row(cls, row: list) -> "GifRecord":
+        return cls.create(**dict(zip(ROW_FIELDS, row)))
+
+def decode_records(data) -> List[GifRecord]:
+    """Decode records from JSON-encoded rows or an already-parsed list of rows"""
+    rows = orjson.loads(data) if isinstance(data, (bytes, str)) else data
+    return [GifRecord.from_row(row) for row in rows or [] if isinstance(row, list) and row]
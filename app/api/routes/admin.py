@@ -0,0 +1,34 @@
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from ..core.config import get_settings
+from ..services.cache import local_cache
+from ..services.gif_manager import get_gif_manager
+
+router = APIRouter()
+settings = get_settings()
+
+def check_admin_token(token: Optional[str]) -> None:
+    if settings.ADMIN_TOKEN and not secrets.compare_digest(
+        (token or "").encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+@router.get("/admin/sources")
+async def get_source_health(x_admin_token: Optional[str] = Header(default=None)) -> dict:
+    check_admin_token(x_admin_token)
+    gif_manager = get_gif_manager()
+    return {
+        "success": True,
+        "data": {
+            "sources": gif_manager.source_health(),
+            "coalescing": gif_manager.flights.stats(),
+            "retries": gif_manager.retries.stats(),
+            "local_cache": local_cache.stats(),
+            "worker": {
+                "pid": os.getpid(),
+                "leader": gif_manager.elector.is_leader if gif_manager.elector else True,
+            },
+        }
+    }
@@ -1,33 +1,84 @@
+import orjson
+from typing import AsyncIterator
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from ..models.schemas import BatchResponse
-from ..services.gif_manager import GifManager
-from ..models.categories import CATEGORIES
+from ..services.gif_manager import get_gif_manager
+from ..services.categories import UnknownCategoryError, get_registry
+from ..core.config import get_settings
+from ..core.responses import FastJSONResponse, gif_payload
 
 router = APIRouter()
+settings = get_settings()
 
 @router.get("/batch", response_model=BatchResponse)
 async def get_batch_gifs(
     count: int = Query(default=5, le=50),
     category: str = Query(default="all")
-) -> BatchResponse:
+) -> FastJSONResponse:
     try:
-        gif_manager = GifManager()
-        categories = [cat["id"] for cat in CATEGORIES] if category == "all" else [category]
-        
-        gifs = await gif_manager.get_gifs(count, categories)
+        categories = get_registry().expand(category)
+    except UnknownCategoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        gif_manager = get_gif_manager()
+        gifs, plan = await gif_manager.get_gifs_planned(count, categories)
         if not gifs:
             raise HTTPException(status_code=404, detail="No gifs found")
         
-        return BatchResponse(
-            success=True,
-            data=[{
-                "id": gif["id"],
-                "url": gif["url"],
-                "size": gif["size"],
-                "dims": gif["dims"],
-                "source": gif["source"],
-                "category": category
-            } for gif in gifs]
+        return FastJSONResponse(
+            {
+                "success": True,
+                "data": [gif_payload(gif, category) for gif in gifs],
+                "error": None
+            },
+            headers=plan.headers() if settings.DEBUG_HEADERS else None
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+def _format_event(fmt: str, event: str, payload: dict) -> bytes:
+    data = orjson.dumps(payload)
+    if fmt == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+    return data + b"\n"
+
+async def _stream_gifs(
+    count: int, categories: list, category: str, fmt: str
+) -> AsyncIterator[bytes]:
+    gif_manager = get_gif_manager()
+    sent = 0
+    try:
+        async for gif in gif_manager.iter_gifs(count, categories):
+            sent += 1
+            yield _format_event(fmt, "gif", gif_payload(gif, category))
+    except Exception as e:
+        yield _format_event(fmt, "error", {"success": False, "error": str(e)})
+        return
+
+    if not sent:
+        yield _format_event(fmt, "error", {"success": False, "error": "No gifs found"})
+    elif fmt == "sse":
+        yield _format_event(fmt, "end", {"success": True, "count": sent})
+
+@router.get("/batch/stream")
+async def stream_batch_gifs(
+    count: int = Query(default=5, le=50),
+    category: str = Query(default="all"),
+    format: str = Query(default="ndjson", pattern="^(ndjson|sse)$")
+) -> StreamingResponse:
+    try:
+        categories = get_registry().expand(category)
+    except UnknownCategoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        _stream_gifs(count, categories, category, format),
+        media_type=STREAM_MEDIA_TYPES[format],
+        headers={"Cache-Control": "no-cache"}
+    )
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 from ..models.schemas import CategoriesResponse
-from ..models.categories import CATEGORIES
+from ..services.categories import get_registry
+from ..core.responses import FastJSONResponse
 
 router = APIRouter()
 
 @router.get("/categories", response_model=CategoriesResponse)
-async def get_categories() -> CategoriesResponse:
-    return CategoriesResponse(success=True, data=CATEGORIES)
\ No newline at end of file
+async def get_categories() -> FastJSONResponse:
+    # The registry validates and encodes the response whenever it is built
+    return FastJSONResponse(get_registry().body)
@@ -1,33 +1,31 @@
 from fastapi import APIRouter, Query, HTTPException
 from ..models.schemas import RandomResponse
-from ..services.gif_manager import GifManager
-from ..models.categories import CATEGORIES
+from ..services.gif_manager import get_gif_manager
+from ..services.categories import UnknownCategoryError, get_registry
+from ..core.config import get_settings
+from ..core.responses import FastJSONResponse, gif_payload
 
 router = APIRouter()
+settings = get_settings()
 
 @router.get("/random", response_model=RandomResponse)
 async def get_random_gif(
     category: str = Query(default="all")
-) -> RandomResponse:
+) -> FastJSONResponse:
     try:
-        gif_manager = GifManager()
-        categories = [cat["id"] for cat in CATEGORIES] if category == "all" else [category]
-        
-        gifs = await gif_manager.get_gifs(1, categories)
+        categories = get_registry().expand(category)
+    except UnknownCategoryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        gif_manager = get_gif_manager()
+        gifs, plan = await gif_manager.get_gifs_planned(1, categories)
         if not gifs:
             raise HTTPException(status_code=404, detail="No gifs found")
         
-        gif = gifs[0]
-        return RandomResponse(
-            success=True,
-            data={
-                "id": gif["id"],
-                "url": gif["url"],
-                "size": gif["size"],
-                "dims": gif["dims"],
-                "source": gif["source"],
-                "category": category
-            }
+        return FastJSONResponse(
+            {"success": True, "data": gif_payload(gifs[0], category), "error": None},
+            headers=plan.headers() if settings.DEBUG_HEADERS else None
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,47 +1,277 @@
-import aiohttp
+import asyncio
+import functools
+import hashlib
 import json
+import time
+from collections import OrderedDict
 from ..core.config import get_settings
+from ..models.gif import GifRecord, decode_records
+from .http import get_http_session
+from .metrics import CACHE_LATENCY, CACHE_LOOKUPS, UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from functools import lru_cache
 import logging
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 class UpstashRedis:
-    def __init__(self, url: str, token: str):
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        batch_window_ms: float = 0,
+        batch_max: int = 50,
+    ):
         self.base_url = url
         self.headers = {
             "Authorization": f"Bearer {token}",
             "Content-Type": "application/json"
         }
+        self.batch_window = batch_window_ms / 1000
+        self.batch_max = max(batch_max, 1)
+        self._queue: List[Tuple[list, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()
 
-    async def _make_request(self, command: list) -> Any:
-        async with aiohttp.ClientSession() as session:
-            try:
+    async def _post(self, path: str, body: list) -> Any:
+        session = get_http_session()
+        try:
+            with CACHE_LATENCY.labels(path or "/").time():
                 async with session.post(
-                    self.base_url,
+                    f"{self.base_url.rstrip('/')}{path}",
                     headers=self.headers,
-                    json=command
+                    json=body
                 ) as response:
                     if response.status != 200:
                         logger.error(f"Upstash error: {response.status}")
                         return None
-                    
-                    result = await response.json()
-                    return result.get("result")
-            except Exception as e:
-                logger.error(f"Error making Upstash request: {str(e)}")
-                return None
 
-async def cache_get(key: str) -> Optional[Any]:
-    """Get value from Upstash Redis"""
-    redis = UpstashRedis(
+                    return await response.json()
+        except Exception as e:
+            logger.error(f"Error making Upstash request: {str(e)}")
+            return None
+
+    async def _make_request(self, command: list) -> Any:
+        result = await self._post("", command)
+        return result.get("result") if isinstance(result, dict) else None
+
+    def _unpack(self, results: Any, count: int) -> List[Any]:
+        if not isinstance(results, list) or len(results) != count:
+            return [None] * count
+        unpacked = []
+        for item in results:
+            if isinstance(item, dict) and "error" in item:
+                logger.error(f"Upstash command error: {item['error']}")
+                unpacked.append(None)
+            else:
+                unpacked.append(item.get("result") if isinstance(item, dict) else None)
+        return unpacked
+
+    async def pipeline(self, commands: List[list]) -> List[Any]:
+        """Send several commands in one request; results come back in order"""
+        if not commands:
+            return []
+        return self._unpack(await self._post("/pipeline", commands), len(commands))
+
+    async def multi_exec(self, commands: List[list]) -> List[Any]:
+        """Send several commands as one atomic transaction"""
+        if not commands:
+            return []
+        return self._unpack(await self._post("/multi-exec", commands), len(commands))
+
+    async def execute(self, command: list) -> Any:
+        """Run a command, merged with concurrent ones into one pipeline when batching is on"""
+        if self.batch_window <= 0:
+            return await self._make_request(command)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((command, future))
+        if len(self._queue) >= self.batch_max:
+            self._flush_queue()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush_queue)
+        return await future
+
+    def _flush_queue(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[list, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                results = [await self._make_request(batch[0][0])]
+            else:
+                results = await self.pipeline([command for command, _ in batch])
+        except Exception as e:
+            logger.error(f"Error flushing Upstash batch: {str(e)}")
+            results = [None] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+@lru_cache()
+def get_redis() -> UpstashRedis:
+    """
+    Get the shared Upstash client.
+    Returns:
+        UpstashRedis: Client with micro-batching configured from settings
+    """
+    return UpstashRedis(
         url=settings.UPSTASH_REDIS_REST_URL,
-        token=settings.UPSTASH_REDIS_REST_TOKEN
+        token=settings.UPSTASH_REDIS_REST_TOKEN,
+        batch_window_ms=settings.CACHE_BATCH_WINDOW_MS,
+        batch_max=settings.CACHE_BATCH_MAX,
     )
+
+class LocalCache:
+    """
+    Size-bounded in-process LRU tier in front of Redis.
+    Entries expire after their TTL but may still be served stale for a
+    grace period while a background refresh runs. Misses can be cached
+    for a short negative TTL.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.LOCAL_CACHE_SIZE,
+        ttl: float = settings.LOCAL_CACHE_TTL,
+        negative_ttl: float = settings.LOCAL_CACHE_NEGATIVE_TTL,
+        stale_ttl: float = settings.LOCAL_CACHE_STALE_TTL,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any, bool]:
+        """Return (found, value, stale) for a key"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None, False
+
+        value, expires_at = entry
+        now = time.monotonic()
+        if now >= expires_at + (self.stale_ttl if value is not None else 0):
+            del self._entries[key]
+            self.misses += 1
+            return False, None, False
+
+        self._entries.move_to_end(key)
+        stale = now >= expires_at
+        if value is None:
+            self.negative_hits += 1
+        elif stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return True, value, stale
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, or a negative entry when value is None"""
+        if self.max_size <= 0:
+            return
+        if ttl is None:
+            ttl = self.ttl
+        ttl = min(ttl, self.negative_ttl if value is None else self.ttl)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class RecentSeen:
+    """
+    Bounded per-key sets of IDs this worker recently marked as seen. An
+    entry expires a fixed time after it was created and is never renewed,
+    so Redis keeps deciding when a seen set is exhausted and reset.
+    """
+
+    def __init__(self, max_members: int = settings.LOCAL_SEEN_SIZE, ttl: float = settings.LOCAL_SEEN_TTL):
+        self.max_members = max_members
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, "OrderedDict[str, None]"]] = {}
+
+    def get(self, key: str) -> "OrderedDict[str, None]":
+        entry = self._entries.get(key)
+        if entry is None:
+            return OrderedDict()
+        expires_at, members = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return OrderedDict()
+        return members
+
+    def add(self, key: str, members: List[str]) -> None:
+        if self.max_members <= 0 or not members:
+            return
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry[0]:
+            entry = self._entries[key] = (time.monotonic() + self.ttl, OrderedDict())
+        recent = entry[1]
+        for member in members:
+            recent[member] = None
+        while len(recent) > self.max_members:
+            recent.popitem(last=False)
+
+    def drop(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+local_cache = LocalCache()
+recent_seen = RecentSeen()
+_revalidations: Dict[str, asyncio.Task] = {}
+
+MARK_SEEN_SCRIPT = """
+local fresh = {}
+local added = 0
+for i = 3, #ARGV do
+    fresh[i - 2] = redis.call('SADD', KEYS[1], ARGV[i])
+    added = added + fresh[i - 2]
+end
+local reset = 0
+if added == 0 and redis.call('SCARD', KEYS[1]) > tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+    reset = 1
+else
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+fresh[#fresh + 1] = reset
+return fresh
+"""
+
+async def _redis_get(key: str) -> Optional[Any]:
+    redis = get_redis()
     
     try:
-        result = await redis._make_request(["GET", key])
+        result = await redis.execute(["GET", key])
         return json.loads(result) if result else None
     except json.JSONDecodeError:
         return result if result else None
@@ -49,35 +279,176 @@ async def cache_get(key: str) -> Optional[Any]:
         logger.error(f"Error in cache_get: {str(e)}")
         return None
 
+async def _revalidate(key: str) -> None:
+    try:
+        local_cache.set(key, await _redis_get(key))
+    finally:
+        _revalidations.pop(key, None)
+
+async def cache_get(key: str) -> Optional[Any]:
+    """Get value from the local tier, falling back to Upstash Redis"""
+    found, value, stale = local_cache.get(key)
+    if found:
+        if stale and key not in _revalidations:
+            _revalidations[key] = asyncio.create_task(_revalidate(key))
+        CACHE_LOOKUPS.labels("local", "miss" if value is None else "stale" if stale else "hit").inc()
+        return value
+
+    value = await _redis_get(key)
+    local_cache.set(key, value)
+    CACHE_LOOKUPS.labels("redis", "miss" if value is None else "hit").inc()
+    return value
+
 async def cache_set(key: str, value: Any, ex: int = 3600) -> bool:
-    """Set value in Upstash Redis with expiration"""
-    redis = UpstashRedis(
-        url=settings.UPSTASH_REDIS_REST_URL,
-        token=settings.UPSTASH_REDIS_REST_TOKEN
-    )
+    """Set value in both tiers with expiration (write-through)"""
+    redis = get_redis()
+    local_cache.set(key, value, ex)
     
     try:
         value_str = json.dumps(value)
-        result = await redis._make_request(["SETEX", key, str(ex), value_str])
+        result = await redis.execute(["SETEX", key, str(ex), value_str])
         return result == "OK"
     except Exception as e:
         logger.error(f"Error in cache_set: {str(e)}")
         return False
 
+async def cache_delete_pattern(pattern: str) -> int:
+    """Delete keys matching a glob pattern using SCAN, returning how many were removed"""
+    redis = get_redis()
+    deleted = 0
+    cursor = "0"
+
+    while True:
+        result = await redis.execute(["SCAN", cursor, "MATCH", pattern, "COUNT", "500"])
+        if not isinstance(result, list) or len(result) != 2:
+            raise RuntimeError(f"Unexpected SCAN reply for {pattern}")
+        cursor, keys = str(result[0]), result[1]
+        if keys:
+            deleted += await redis.execute(["DEL", *keys]) or 0
+        if cursor == "0":
+            return deleted
+
 async def cache_invalidate(category: str) -> bool:
-    """Invalidate cache for a category"""
-    redis = UpstashRedis(
-        url=settings.UPSTASH_REDIS_REST_URL,
-        token=settings.UPSTASH_REDIS_REST_TOKEN
-    )
-    
+    """Invalidate cached provider results for a category, or for every category"""
+    prefix = "gifs_" if category == "all" else f"gifs_{category}"
+    local_cache.delete_prefix(prefix)
+
     try:
-        if category == "all":
-            result = await redis._make_request(["FLUSHDB"])
-            return result == "OK"
-        else:
-            result = await redis._make_request(["DEL", f"gifs_{category}"])
-            return result >= 0
+        await cache_delete_pattern(f"{prefix}*")
+        return True
     except Exception as e:
         logger.error(f"Error in cache_invalidate: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+def provider_cache_key(source: str, category: str, query: str, offset: Any, limit: int) -> str:
+    """Deterministic cache key for one provider search"""
+    digest = hashlib.blake2b(f"{query}|{offset}|{limit}".encode(), digest_size=8).hexdigest()
+    return f"gifs_{category}_{source}_{digest}"
+
+def cache_provider_results(
+    source: str, ttl: int, query: Callable[[str], str]
+) -> Callable[[Callable[..., Awaitable[List[GifRecord]]]], Callable[..., Awaitable[List[GifRecord]]]]:
+    """Cache the normalized results of a provider search function"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(limit=20, category="all", offset=0):
+            key = provider_cache_key(source, category, query(category), offset, limit)
+            cached = await cache_get(key)
+            if isinstance(cached, list):
+                records = decode_records(cached)
+                if records:
+                    return records
+
+            try:
+                with UPSTREAM_LATENCY.labels(source, category).time():
+                    gifs = await func(limit, category, offset)
+            except Exception:
+                UPSTREAM_ERRORS.labels(source).inc()
+                raise
+            if gifs:
+                await cache_set(key, [gif.to_row() for gif in gifs], ttl)
+            return gifs
+        return wrapper
+    return decorator
+
+async def cache_list_push(key: str, values: List[Any], ex: int = 3600) -> bool:
+    """Append values to a Redis list and refresh its expiration"""
+    redis = get_redis()
+
+    try:
+        if not values:
+            return True
+        result, _ = await redis.multi_exec([
+            ["RPUSH", key, *[json.dumps(v) for v in values]],
+            ["EXPIRE", key, str(ex)],
+        ])
+        return result is not None
+    except Exception as e:
+        logger.error(f"Error in cache_list_push: {str(e)}")
+        return False
+
+async def cache_list_pop(key: str, count: int) -> List[Any]:
+    """Pop up to count values from the head of a Redis list"""
+    redis = get_redis()
+
+    try:
+        result = await redis.execute(["LPOP", key, str(count)])
+        if not result:
+            return []
+        values = []
+        for item in result:
+            try:
+                values.append(json.loads(item))
+            except (json.JSONDecodeError, TypeError):
+                continue
+        return values
+    except Exception as e:
+        logger.error(f"Error in cache_list_pop: {str(e)}")
+        return []
+
+async def cache_mark_seen_many(
+    batches: List[Tuple[str, List[str]]], ex: int = 86400, max_size: int = 1000
+) -> List[List[bool]]:
+    """
+    Atomically add members to Redis sets for several (key, members) batches
+    in one pipeline. Returns whether each member was new; a set is reset
+    once it exceeds max_size and nothing new was added.
+    Members this worker already knows are seen are answered from the local
+    tier and not sent.
+    """
+    redis = get_redis()
+
+    try:
+        # Decide what to send up front: other requests may change the local
+        # tier while the pipeline is in flight
+        masks = []
+        unknown = []
+        for key, members in batches:
+            seen = recent_seen.get(key)
+            mask = [member not in seen for member in members]
+            masks.append(mask)
+            unknown.append([member for member, send in zip(members, mask) if send])
+
+        commands = [
+            ["EVAL", MARK_SEEN_SCRIPT, "1", key, str(ex), str(max_size), *members]
+            for (key, _), members in zip(batches, unknown) if members
+        ]
+        results = iter(await redis.pipeline(commands))
+
+        flags = []
+        for (key, members), mask, sent in zip(batches, masks, unknown):
+            result = next(results) if sent else [0]
+            if not isinstance(result, list) or len(result) != len(sent) + 1:
+                flags.append([True] * len(members))
+                continue
+            sent_flags = iter(result)
+            flags.append([bool(next(sent_flags)) if send else False for send in mask])
+            if result[-1]:
+                # Redis reset the exhausted set; stop answering from the stale local copy
+                recent_seen.drop(key)
+            else:
+                recent_seen.add(key, sent)
+        return flags
+    except Exception as e:
+        logger.error(f"Error in cache_mark_seen_many: {str(e)}")
+        return [[True] * len(members) for _, members in batches]
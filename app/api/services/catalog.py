@@ -0,0 +1,246 @@
+import asyncio
+import bisect
+import itertools
+import logging
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from ..models.gif import GifRecord
+from . import sampling
+
+logger = logging.getLogger(__name__)
+
+CatalogKey = Tuple[str, str]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS gifs (
+    url TEXT NOT NULL UNIQUE,
+    width INTEGER,
+    height INTEGER,
+    size INTEGER,
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    harvested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_gifs_category_source ON gifs (category, source);
+CREATE TABLE IF NOT EXISTS harvest_state (
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    next_offset INTEGER NOT NULL,
+    PRIMARY KEY (source, category)
+);
+"""
+
+class GifCatalog:
+    """
+    Local SQLite store of harvested GIF metadata.
+    Row IDs are kept in memory per (category, source) so a random GIF is
+    one list index plus one primary-key lookup. Lookups use their own
+    connection, so with WAL they never wait on a harvest commit.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._rowids: Dict[CatalogKey, List[int]] = {}
+        self._loaded_rowid = 0
+        self._added: Set[int] = set()
+
+    def open(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            rowids: Dict[CatalogKey, List[int]] = {}
+            for rowid, category, source in conn.execute(
+                "SELECT rowid, category, source FROM gifs"
+            ):
+                rowids.setdefault((category, source), []).append(rowid)
+            reader = sqlite3.connect(self.path, check_same_thread=False)
+            reader.execute("PRAGMA query_only=ON")
+            self._conn = conn
+            self._reader = reader
+            self._rowids = rowids
+            self._loaded_rowid = max((max(ids) for ids in rowids.values()), default=0)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            with self._read_lock:
+                if self._reader is not None:
+                    self._reader.close()
+                    self._reader = None
+
+    def __len__(self) -> int:
+        return sum(len(rowids) for rowids in self._rowids.values())
+
+    def add(self, source: str, category: str, gifs: List[GifRecord]) -> int:
+        """Insert GIFs harvested for a source and category, returning how many were new"""
+        if self._conn is None or not gifs:
+            return 0
+        new = []
+        now = time.time()
+        with self._lock:
+            for gif in gifs:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO gifs "
+                    "(url, width, height, size, source, category, harvested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (gif.url, gif.width, gif.height, gif.size, source, category, now),
+                )
+                if cursor.rowcount == 1:
+                    new.append(cursor.lastrowid)
+            self._conn.commit()
+            # Publish row IDs only once committed, so the reader can see them
+            self._rowids.setdefault((category, source), []).extend(new)
+            if new and new[0] == self._loaded_rowid + 1 and new[-1] - new[0] + 1 == len(new):
+                # No other writer inserted in between, so refresh has nothing to skip
+                self._loaded_rowid = new[-1]
+            else:
+                self._added.update(new)
+        return len(new)
+
+    def refresh(self) -> int:
+        """Pick up rows other processes inserted since the last load, returning how many"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT rowid, category, source FROM gifs WHERE rowid > ? ORDER BY rowid",
+                (self._loaded_rowid,),
+            ).fetchall()
+            new = 0
+            for rowid, category, source in rows:
+                if rowid not in self._added:
+                    self._rowids.setdefault((category, source), []).append(rowid)
+                    new += 1
+                self._loaded_rowid = rowid
+            self._added.clear()
+        return new
+
+    def random(self, count: int, sources: List[str], categories: List[str]) -> List[GifRecord]:
+        """Pick up to count distinct random GIFs for the given sources and categories"""
+        if self._reader is None:
+            return []
+        lists = [
+            self._rowids[(category, source)]
+            for category in categories for source in sources
+            if self._rowids.get((category, source))
+        ]
+        ends = list(itertools.accumulate(len(rowids) for rowids in lists))
+        if not ends:
+            return []
+
+        picked = []
+        for index in sampling.sample(range(ends[-1]), count):
+            i = bisect.bisect_right(ends, index)
+            picked.append(lists[i][index - (ends[i - 1] if i else 0)])
+
+        with self._read_lock:
+            rows = self._reader.execute(
+                "SELECT rowid, url, width, height, size, source, category FROM gifs "
+                f"WHERE rowid IN ({','.join('?' * len(picked))})",
+                picked,
+            ).fetchall()
+        # SQLite returns rows in rowid order; restore the sampled order
+        by_rowid = {row[0]: row[1:] for row in rows}
+        gifs = []
+        for rowid in picked:
+            row = by_rowid.get(rowid)
+            if row is not None:
+                url, width, height, size, source, category = row
+                gifs.append(GifRecord.create(url, source, category, size, width, height))
+        return gifs
+
+    def next_offset(self, source: str, category: str) -> int:
+        if self._conn is None:
+            return 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT next_offset FROM harvest_state WHERE source = ? AND category = ?",
+                (source, category),
+            ).fetchone()
+        return row[0] if row else 0
+
+    def set_next_offset(self, source: str, category: str, offset: int) -> None:
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO harvest_state (source, category, next_offset) VALUES (?, ?, ?) "
+                "ON CONFLICT (source, category) DO UPDATE SET next_offset = excluded.next_offset",
+                (source, category, offset),
+            )
+            self._conn.commit()
+
+class CatalogHarvester:
+    """Incrementally pages through provider results into the catalog in the background"""
+
+    def __init__(
+        self,
+        catalog: GifCatalog,
+        fetch: Callable[[str, str, int], Awaitable[List[GifRecord]]],
+        keys: List[Tuple[str, str]],
+        max_offsets: Dict[str, int],
+        interval: float,
+        batch: int,
+    ):
+        self.catalog = catalog
+        self.fetch = fetch
+        self.keys = keys
+        self.max_offsets = max_offsets
+        self.interval = interval
+        self.batch = max(batch, 1)
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def harvest_key(self, source: str, category: str) -> int:
+        """Fetch the next page for a (source, category) and store it"""
+        offset = await asyncio.to_thread(self.catalog.next_offset, source, category)
+        gifs = await self.fetch(source, category, offset)
+        added = await asyncio.to_thread(self.catalog.add, source, category, gifs)
+        next_offset = offset + max(len(gifs), 1)
+        if not gifs or next_offset >= self.max_offsets.get(source, 1000):
+            next_offset = 0
+        await asyncio.to_thread(self.catalog.set_next_offset, source, category, next_offset)
+        return added
+
+    async def harvest_round(self) -> int:
+        """Harvest the next batch of keys in round-robin order"""
+        keys = [
+            self.keys[(self._cursor + i) % len(self.keys)]
+            for i in range(min(self.batch, len(self.keys)))
+        ]
+        self._cursor = (self._cursor + len(keys)) % max(len(self.keys), 1)
+        results = await asyncio.gather(
+            *[self.harvest_key(*key) for key in keys], return_exceptions=True
+        )
+        return sum(result for result in results if isinstance(result, int))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                added = await self.harvest_round()
+                if added:
+                    logger.info(f"Catalog harvested {added} new GIFs ({len(self.catalog)} total)")
+            except Exception as e:
+                logger.error(f"Error harvesting catalog: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.keys and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional, Tuple
+import orjson
+from pydantic import ValidationError
+from ..core.config import get_settings
+from ..models.categories import CATEGORIES
+from ..models.schemas import Category, CategoriesResponse
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+ALL = "all"
+DEFAULT_TERMS = ("anime",)
+DEFAULT_SUBREDDITS = ("animegifs",)
+MAX_GIPHY_QUERY_LENGTH = 50
+
+class UnknownCategoryError(ValueError):
+    """A request named a category the registry does not know"""
+
+def giphy_query(terms: Tuple[str, ...]) -> str:
+    """Anime plus the first other term that keeps the query within Giphy's length limit"""
+    query_parts = ["anime"]
+    for term in terms:
+        if term == "anime":
+            continue
+        if len(f"{query_parts[0]} {term}") <= MAX_GIPHY_QUERY_LENGTH:
+            query_parts.append(term)
+            break
+    return " ".join(query_parts)
+
+@dataclass(frozen=True)
+class CategoryEntry:
+    """A category with its provider query parameters computed once"""
+    id: str
+    terms: Tuple[str, ...]
+    subreddits: Tuple[str, ...]
+    tenor_query: str
+    giphy_query: str
+
+    @classmethod
+    def build(cls, id: str, terms: Tuple[str, ...], subreddits: Tuple[str, ...]) -> "CategoryEntry":
+        return cls(
+            id=id,
+            terms=terms,
+            subreddits=subreddits,
+            tenor_query=" ".join(terms),
+            giphy_query=giphy_query(terms),
+        )
+
+class CategoryRegistry:
+    """
+    Immutable snapshot of the configured categories, built once and swapped
+    whole on reload. Lookups are dict hits; the /api/categories body is
+    encoded at build time.
+    """
+
+    def __init__(self, categories: List[Category], version: str = "builtin"):
+        entries = {}
+        for category in categories:
+            if category.id == ALL:
+                raise ValueError(f'"{ALL}" is reserved and cannot be configured as a category')
+            if category.id in entries:
+                raise ValueError(f"Duplicate category {category.id!r}")
+            entries[category.id] = CategoryEntry.build(
+                category.id, tuple(category.terms), tuple(category.subreddits)
+            )
+        if not entries:
+            raise ValueError("At least one category is required")
+
+        self.version = version
+        self.entries: Mapping[str, CategoryEntry] = MappingProxyType(entries)
+        self.ids: Tuple[str, ...] = tuple(entries)
+        self.subreddits: Tuple[str, ...] = tuple(sorted(
+            {name for entry in entries.values() for name in entry.subreddits}
+        ))
+        self.fallback = CategoryEntry.build(ALL, DEFAULT_TERMS, DEFAULT_SUBREDDITS)
+        self.body: bytes = orjson.dumps(
+            CategoriesResponse(success=True, data=categories).model_dump()
+        )
+
+    def get(self, category_id: str) -> CategoryEntry:
+        """Entry for a category; "all" and unknown IDs get the generic anime entry"""
+        return self.entries.get(category_id, self.fallback)
+
+    def expand(self, category_id: str) -> List[str]:
+        """Category IDs a request for category_id covers, rejecting unknown ones"""
+        if category_id == ALL:
+            return list(self.ids)
+        if category_id not in self.entries:
+            raise UnknownCategoryError(f"Unknown category: {category_id}")
+        return [category_id]
+
+def load_registry(path: str) -> CategoryRegistry:
+    """Build a registry from a JSON file shaped like the /api/categories data"""
+    with open(path, "rb") as f:
+        data = orjson.loads(f.read())
+    if isinstance(data, dict):
+        data = data.get("categories") or data.get("data")
+    if not isinstance(data, list):
+        raise ValueError("Expected a list of categories")
+    return CategoryRegistry(
+        [Category.model_validate(item) for item in data],
+        version=str(os.stat(path).st_mtime_ns),
+    )
+
+_registry = CategoryRegistry([Category.model_validate(item) for item in CATEGORIES])
+_rejected_version: Optional[str] = None
+_reload_task: Optional[asyncio.Task] = None
+
+def get_registry() -> CategoryRegistry:
+    return _registry
+
+def reload_registry(path: Optional[str] = None) -> bool:
+    """Swap in the category file when it changed, returning whether the registry was replaced"""
+    global _registry, _rejected_version
+    path = path or settings.CATEGORIES_PATH
+    if not path:
+        return False
+    try:
+        version = str(os.stat(path).st_mtime_ns)
+    except OSError as e:
+        logger.error(f"Error loading categories from {path}: {str(e)}")
+        return False
+    if version in (_registry.version, _rejected_version):
+        return False
+    try:
+        registry = load_registry(path)
+    except (OSError, ValueError, ValidationError) as e:
+        # Keep serving the previous registry and report each bad revision once
+        _rejected_version = version
+        logger.error(f"Error loading categories from {path}: {str(e)}")
+        return False
+    _registry = registry
+    logger.info(f"Loaded {len(registry.ids)} categories from {path}")
+    return True
+
+# Load the configured file at import so components sized at startup see it
+reload_registry()
+
+async def _reload_loop(on_reload: Optional[Callable[[CategoryRegistry], None]]) -> None:
+    while True:
+        await asyncio.sleep(settings.CATEGORIES_RELOAD_INTERVAL)
+        if reload_registry() and on_reload:
+            on_reload(_registry)
+
+def start_registry_reload(on_reload: Optional[Callable[[CategoryRegistry], None]] = None) -> None:
+    """Load CATEGORIES_PATH and keep watching it for changes"""
+    global _reload_task
+    if not settings.CATEGORIES_PATH:
+        return
+    if reload_registry() and on_reload:
+        on_reload(_registry)
+    if _reload_task is None or _reload_task.done():
+        _reload_task = asyncio.create_task(_reload_loop(on_reload))
+
+async def stop_registry_reload() -> None:
+    global _reload_task
+    if _reload_task:
+        _reload_task.cancel()
+        await asyncio.gather(_reload_task, return_exceptions=True)
+        _reload_task = None
@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import io
+import logging
+import re
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+from ..core.config import get_settings
+from ..models.gif import GifRecord
+from .cache import cache_get, cache_set
+from .http import get_http_session
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+GIPHY_HOST = re.compile(r"^(media\d*|i)\.giphy\.com$")
+TENOR_HOST = re.compile(r"^(media\d*|c)\.tenor\.com$")
+MEDIA_EXTENSIONS = (".gifv", ".gif", ".mp4", ".webm", ".webp")
+
+def _strip_extension(name: str) -> str:
+    for extension in MEDIA_EXTENSIONS:
+        if name.endswith(extension):
+            return name[:-len(extension)]
+    return name
+
+@lru_cache(maxsize=65536)
+def canonical_url(url: str) -> str:
+    """
+    Reduce a GIF URL to a host-independent media key, so the same GIF linked
+    from different hosts, mirrors or renditions compares equal. Keys are
+    lowercased because Reddit URLs are lowercased when fetched.
+    """
+    parts = urlsplit(url.strip().lower())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    segments = [segment for segment in parts.path.split("/") if segment]
+
+    if GIPHY_HOST.match(host) or host == "giphy.com":
+        # media.giphy.com/media/<id>/giphy.gif, i.giphy.com/<id>.gif, giphy.com/gifs/<slug>-<id>
+        if len(segments) >= 2 and segments[0] == "media":
+            return f"giphy/{segments[-2] if len(segments) > 2 else _strip_extension(segments[1])}"
+        if segments and segments[0] == "gifs":
+            return f"giphy/{segments[-1].rsplit('-', 1)[-1]}"
+        if segments:
+            return f"giphy/{_strip_extension(segments[-1])}"
+    if TENOR_HOST.match(host) and segments:
+        # media.tenor.com/[m/]<id><5-char rendition code>/<name>.gif
+        media_id = segments[-2] if len(segments) > 1 else _strip_extension(segments[0])
+        return f"tenor/{media_id[:-5] if len(media_id) > 5 else media_id}"
+    if host == "tenor.com" and segments:
+        return f"tenor/view/{segments[-1].rsplit('-', 1)[-1]}"
+    if host.endswith("imgur.com") and segments:
+        return f"imgur/{_strip_extension(segments[-1])}"
+    if host in ("i.redd.it", "preview.redd.it") and segments:
+        return f"redd.it/{_strip_extension(segments[-1])}"
+
+    path = parts.path.rstrip("/")
+    if path.endswith(".gifv"):
+        path = path[:-1]
+    return f"{host}{path}"
+
+def media_key(gif: GifRecord) -> str:
+    return canonical_url(gif.url)
+
+def _dhash(data: bytes) -> int:
+    """64-bit difference hash of the first frame"""
+    with Image.open(io.BytesIO(data)) as image:
+        image.seek(0)
+        pixels = list(image.convert("L").resize((9, 8)).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+class Deduplicator:
+    """
+    Drops GIFs that are the same media under a different URL, and optionally
+    near-identical frames by perceptual hash. Hashes are computed in the
+    background once per media key and cached, so requests only use known ones.
+    """
+
+    def __init__(
+        self,
+        phash: bool = settings.DEDUP_PHASH,
+        distance: int = settings.DEDUP_PHASH_DISTANCE,
+        cache_size: int = settings.DEDUP_PHASH_CACHE_SIZE,
+        concurrency: int = settings.DEDUP_PHASH_CONCURRENCY,
+    ):
+        if phash and Image is None:
+            logger.warning("DEDUP_PHASH is set but Pillow is not installed, perceptual dedup disabled")
+            phash = False
+        self.phash = phash
+        self.distance = distance
+        self.cache_size = cache_size
+        self._hashes: "OrderedDict[str, Optional[int]]" = OrderedDict()
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self.duplicates = 0
+
+    def known_hash(self, key: str) -> Optional[int]:
+        value = self._hashes.get(key)
+        if value is not None:
+            self._hashes.move_to_end(key)
+        return value
+
+    def _remember(self, key: str, value: Optional[int]) -> None:
+        self._hashes[key] = value
+        self._hashes.move_to_end(key)
+        while len(self._hashes) > self.cache_size:
+            self._hashes.popitem(last=False)
+
+    def unique(
+        self,
+        gifs: Iterable[GifRecord],
+        keys: Optional[Set[str]] = None,
+        hashes: Optional[List[int]] = None,
+    ) -> List[GifRecord]:
+        """
+        Keep the first GIF of each media key (and perceptual hash). When given,
+        keys and hashes hold what was already kept and are updated in place, so
+        calls can be chained across results.
+        """
+        keys = set() if keys is None else keys
+        hashes = [] if hashes is None else hashes
+        unknown = []
+        kept = []
+        for gif in gifs:
+            key = media_key(gif)
+            if key in keys:
+                self.duplicates += 1
+                continue
+            if self.phash:
+                value = self.known_hash(key)
+                if value is None:
+                    if key not in self._hashes:
+                        unknown.append(gif)
+                elif any(bin(value ^ other).count("1") <= self.distance for other in hashes):
+                    self.duplicates += 1
+                    continue
+                else:
+                    hashes.append(value)
+            keys.add(key)
+            kept.append(gif)
+        if unknown:
+            self.schedule_hashes(unknown)
+        return kept
+
+    def schedule_hashes(self, gifs: List[GifRecord]) -> None:
+        """Compute perceptual hashes for GIFs not seen before, in the background"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for gif in gifs:
+            key = media_key(gif)
+            if key in self._pending or key in self._hashes:
+                continue
+            self._pending.add(key)
+            task = loop.create_task(self._hash(key, gif.url))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _hash(self, key: str, url: str) -> None:
+        cache_key = f"phash_{hashlib.blake2b(key.encode(), digest_size=8).hexdigest()}"
+        try:
+            async with self._semaphore:
+                cached = await cache_get(cache_key)
+                if isinstance(cached, int):
+                    self._remember(key, cached)
+                    return
+                data = await self._download(url)
+                value = await asyncio.to_thread(_dhash, data) if data else None
+                self._remember(key, value)
+                if value is not None:
+                    await cache_set(cache_key, value, settings.DEDUP_PHASH_TTL)
+        except Exception as e:
+            logger.warning(f"Error hashing {url}: {str(e)}")
+            self._remember(key, None)
+        finally:
+            self._pending.discard(key)
+
+    async def _download(self, url: str) -> Optional[bytes]:
+        session = get_http_session()
+        async with asyncio.timeout(settings.PROVIDER_TIMEOUT):
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return None
+                if (response.content_length or 0) > settings.DEDUP_PHASH_MAX_BYTES:
+                    return None
+                data = await response.content.read(settings.DEDUP_PHASH_MAX_BYTES + 1)
+                return data if len(data) <= settings.DEDUP_PHASH_MAX_BYTES else None
+
+    async def close(self) -> None:
+        """Cancel running hash computations"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._pending.clear()
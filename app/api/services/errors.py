@@ -0,0 +1,11 @@
+class ProviderError(Exception):
+    """An upstream GIF provider failed to answer a search"""
+
+class RateLimitError(ProviderError):
+    """An upstream GIF provider or our own quota refused the call"""
+
+class QuotaExceededError(RateLimitError):
+    """Our client-side token bucket for a provider is empty"""
+
+class FetchFailedError(ProviderError):
+    """A foreground fetch did not get an answer from the provider"""
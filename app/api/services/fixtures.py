@@ -0,0 +1,43 @@
+import json
+import logging
+from typing import Awaitable, Callable, Dict, List
+from ..models.gif import GifRecord
+
+logger = logging.getLogger(__name__)
+
+ProviderFunction = Callable[..., Awaitable[List[GifRecord]]]
+
+def load_fixture_providers(path: str) -> Dict[str, ProviderFunction]:
+    """
+    Build offline stand-ins for the provider search functions from a JSON
+    fixture shaped like {"tenor": {"cute": [gif, ...], "all": [...]}, ...}.
+    Each stand-in pages through its list by offset, wrapping around.
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    def make_provider(source: str) -> ProviderFunction:
+        by_category = data.get(source, {})
+
+        async def fetch(limit=20, category="all", offset=0):
+            gifs = by_category.get(category) or by_category.get("all") or []
+            if not gifs:
+                return []
+            start = offset % len(gifs)
+            page = (gifs[start:] + gifs[:start])[:limit]
+            return [
+                GifRecord.create(
+                    url=gif["url"],
+                    source=source,
+                    category=category,
+                    size=gif.get("size"),
+                    width=(gif.get("dims") or [None, None])[0],
+                    height=(gif.get("dims") or [None, None])[1],
+                )
+                for gif in page
+            ]
+
+        return fetch
+
+    logger.info(f"Using provider fixtures from {path}")
+    return {source: make_provider(source) for source in data}
@@ -1,16 +1,58 @@
-import secrets
 import asyncio
 import logging
-from typing import List, Dict, Set
+import math
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, List, Dict, Optional, Set, Tuple
 from .tenor import get_anime_gifs
-from .reddit import get_reddit_gifs
+from .reddit import get_reddit_gifs, start_listing_refresh, stop_listing_refresh
 from .giphy import get_giphy_gifs
-from .cache import cache_get, cache_set
+from .cache import cache_mark_seen_many
+from .pool import GifPool
+from .singleflight import SingleFlight
+from .health import CircuitBreaker
+from .errors import FetchFailedError, ProviderError, QuotaExceededError
+from .retry import RetryWorker
+from .leader import LeaderElector, create_leader_lock
+from .shared_pool import SharedGifRing
+from .catalog import CatalogHarvester, GifCatalog
+from .categories import CategoryRegistry, get_registry, start_registry_reload, stop_registry_reload
+from .fixtures import load_fixture_providers
+from .dedup import Deduplicator, media_key
+from . import sampling
+from .metrics import FANOUT_WIDTH
+from ..core.config import get_settings
+from ..models.gif import GifRecord
+from functools import lru_cache
 import hashlib
 from datetime import datetime
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
+settings = get_settings()
+
+class FetchPlan:
+    """Upstream (source, category) calls chosen to serve one request"""
+
+    def __init__(self, count: int, pooled: int = 0):
+        self.count = count
+        self.pooled = pooled
+        self.calls: List[Tuple[str, str]] = []
+        self.reserve: List[Tuple[str, str]] = []
+        self.expected = 0.0
+        self.launched = 0
+
+    @property
+    def cost(self) -> int:
+        return self.launched
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-Plan-Pooled": str(self.pooled),
+            "X-Plan-Calls": ",".join(f"{source}:{category}" for source, category in self.calls),
+            "X-Plan-Expected": f"{self.expected:.1f}",
+            "X-Plan-Cost": str(self.cost),
+        }
 
 class GifManager:
     def __init__(self):
@@ -20,98 +62,639 @@ class GifManager:
             "reddit": get_reddit_gifs,
             "giphy": get_giphy_gifs,
         }
+        if settings.PROVIDER_FIXTURES:
+            self.source_functions = load_fixture_providers(settings.PROVIDER_FIXTURES)
         self.max_offsets = {"reddit": 50, "tenor": 1000, "giphy": 1000}
+        self.page_sizes = {"tenor": settings.TENOR_PAGE_SIZE, "giphy": settings.GIPHY_PAGE_SIZE}
+        self.cursors: Dict[Tuple[str, str], int] = {}
+        self.buffers: Dict[Tuple[str, str], Deque[GifRecord]] = {}
+        self.flights = SingleFlight()
+        self.breakers = {
+            source: CircuitBreaker(
+                source,
+                window=settings.BREAKER_WINDOW,
+                failure_rate=settings.BREAKER_FAILURE_RATE,
+                min_calls=settings.BREAKER_MIN_CALLS,
+                open_seconds=settings.BREAKER_OPEN_SECONDS,
+            )
+            for source in self.sources
+        }
+        self.dedup = Deduplicator()
+        self.retries = RetryWorker(self._retry_source)
+        self.pool = GifPool(self.get_gifs_from_source) if settings.POOL_ENABLED else None
+        self.yields: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self.catalog = GifCatalog(settings.CATALOG_PATH) if settings.CATALOG_ENABLED else None
+        self.harvester = CatalogHarvester(
+            self.catalog,
+            self.fetch_from_source,
+            self._harvest_keys(get_registry()),
+            self.max_offsets,
+            settings.CATALOG_HARVEST_INTERVAL,
+            settings.CATALOG_HARVEST_BATCH,
+        ) if self.catalog is not None else None
+        self.shared = SharedGifRing(
+            settings.SHARED_POOL_PATH,
+            settings.SHARED_POOL_MAX_KEYS,
+            settings.SHARED_POOL_SLOTS,
+            settings.SHARED_POOL_SLOT_SIZE,
+        ) if settings.WORKERS > 1 else None
+        self.elector = LeaderElector(
+            create_leader_lock(), self._start_leader, self._stop_leader
+        ) if self.shared is not None else None
+        self._publisher: Optional[asyncio.Task] = None
+        self._catalog_refresh: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Open the catalog and start background work. With several workers only
+        the elected leader harvests and refills; every worker serves from the
+        shared ring.
+        """
+        start_registry_reload(self._on_categories_reloaded)
+        if self.catalog is not None:
+            await asyncio.to_thread(self.catalog.open)
+        if self.shared is None:
+            await self._start_leader()
+            return
+        await asyncio.to_thread(self.shared.open)
+        await self.elector.start()
+        if self.catalog is not None:
+            self._catalog_refresh = asyncio.create_task(self._refresh_catalog())
+
+    async def _start_leader(self) -> None:
+        """Start harvesting, listing refreshes and pool warming in this process"""
+        if self.harvester:
+            self.harvester.start()
+        if not settings.PROVIDER_FIXTURES:
+            start_listing_refresh()
+        if self.pool:
+            self.pool.warm(self.sources, list(get_registry().ids))
+            if self.shared is not None:
+                self._publisher = asyncio.create_task(self._publish())
+
+    def _harvest_keys(self, registry: CategoryRegistry) -> List[Tuple[str, str]]:
+        return [(source, category) for category in registry.ids for source in self.sources]
+
+    def _on_categories_reloaded(self, registry: CategoryRegistry) -> None:
+        """Harvest and pre-warm the categories of a reloaded registry"""
+        if self.harvester:
+            self.harvester.keys = self._harvest_keys(registry)
+        if self.pool and (self.elector is None or self.elector.is_leader):
+            self.pool.warm(self.sources, list(registry.ids))
+
+    async def _stop_leader(self) -> None:
+        if self.harvester:
+            await self.harvester.stop()
+        await stop_listing_refresh()
+        if self._publisher:
+            self._publisher.cancel()
+            await asyncio.gather(self._publisher, return_exceptions=True)
+            self._publisher = None
+
+    async def _publish(self) -> None:
+        """Keep the shared ring topped up from the leader's pool"""
+        while True:
+            try:
+                # Follow the current registry so reloaded categories are published too
+                keys = [
+                    (source, category) for category in get_registry().ids
+                    for source in self.sources
+                ]
+                for source, category in keys:
+                    missing = self.pool.high_watermark - self.shared.depth(source, category)
+                    if missing < self.pool.high_watermark - self.pool.low_watermark:
+                        continue
+                    gifs = []
+                    while len(gifs) < missing:
+                        gif = self.pool.pop(source, category)
+                        if gif is None:
+                            break
+                        gifs.append(gif)
+                    stored = self.shared.push(source, category, gifs)
+                    if stored < len(gifs):
+                        self.pool.put(source, category, gifs[stored:])
+            except Exception as e:
+                logger.error(f"Error publishing to the shared pool: {str(e)}")
+            await asyncio.sleep(settings.SHARED_POOL_PUBLISH_INTERVAL)
+
+    async def _refresh_catalog(self) -> None:
+        while True:
+            await asyncio.sleep(settings.CATALOG_REFRESH_INTERVAL)
+            try:
+                await asyncio.to_thread(self.catalog.refresh)
+            except Exception as e:
+                logger.error(f"Error refreshing catalog: {str(e)}")
+
+    def _take_ready(self, count: int, categories: List[str]) -> List[GifRecord]:
+        """Take pre-warmed GIFs from the shared ring or the local pool"""
+        if self.shared is not None:
+            return self.shared.take(count, self.sources, categories)
+        if self.pool:
+            return self.pool.take(count, self.sources, categories)
+        return []
+
+    def _keep_surplus(self, source: str, category: str, gifs: List[GifRecord]) -> None:
+        """Keep GIFs a request did not need for later ones"""
+        if self.shared is not None:
+            self.shared.push(source, category, gifs)
+        elif self.pool:
+            self.pool.put(source, category, gifs)
+
+    async def stop(self) -> None:
+        """Stop background harvesting, retries, pool refills and hashing"""
+        await stop_registry_reload()
+        if self.elector is not None:
+            await self.elector.stop()
+        else:
+            await self._stop_leader()
+        if self._catalog_refresh:
+            self._catalog_refresh.cancel()
+            await asyncio.gather(self._catalog_refresh, return_exceptions=True)
+            self._catalog_refresh = None
+        await self.retries.close()
+        if self.pool:
+            await self.pool.close()
+        await self.dedup.close()
+        if self.catalog is not None:
+            self.catalog.close()
+        if self.shared is not None:
+            self.shared.close()
 
     def _get_session_key(self, source: str) -> str:
         """Generate a session key based on source and date"""
         date = datetime.now().strftime("%Y-%m-%d")
-        return f"session_{source}_{date}"
-
-    async def get_seen_gifs(self, source: str) -> Set[str]:
-        """Get previously seen GIFs for this session"""
-        session_key = self._get_session_key(source)
-        seen_gifs = await cache_get(session_key)
-        return set(seen_gifs) if seen_gifs else set()
-
-    async def update_seen_gifs(self, source: str, gif_urls: List[str]) -> None:
-        """Update seen GIFs for this session"""
-        session_key = self._get_session_key(source)
-        seen_gifs = await self.get_seen_gifs(source)
-        seen_gifs.update(gif_urls)
-        await cache_set(session_key, list(seen_gifs), 86400)
-
-    def _secure_shuffle(self, items: List) -> List:
-        """Perform a cryptographically secure shuffle of items"""
-        items = items.copy()
-        for i in range(len(items) - 1, 0, -1):
-            j = secrets.randbelow(i + 1)
-            items[i], items[j] = items[j], items[i]
-        return items
-
-    def _get_source_offset(self, source: str) -> int:
-        """Get appropriate offset for each source"""
+        return f"seen_{source}_{date}"
+
+    def _seen_id(self, url: str) -> str:
+        """Compact hashed ID used for seen tracking"""
+        return hashlib.blake2b(url.encode(), digest_size=8).hexdigest()
+
+    async def mark_seen_batches(self, batches: List[Tuple[str, List[str]]]) -> List[List[bool]]:
+        """Mark several (source, urls) batches as seen in one pipelined round trip"""
+        return await cache_mark_seen_many([
+            (self._get_session_key(source), [self._seen_id(url) for url in urls])
+            for source, urls in batches
+        ], 86400, 1000)
+
+    def _weighted_sources(self) -> List[str]:
+        """Available sources in random order, biased towards healthy, fast ones"""
+        return sampling.weighted_sample(
+            self.sources, [self.breakers[source].weight() for source in self.sources]
+        )
+
+    def source_health(self) -> Dict[str, Dict]:
+        """Circuit breaker state for every source"""
+        return {source: breaker.snapshot() for source, breaker in self.breakers.items()}
+
+    def _get_source_offset(self, source: str, category: str) -> int:
+        """
+        Get a page-aligned offset so searches can be cached. Paged sources
+        walk their results page by page from a random starting page.
+        """
         max_offset = self.max_offsets.get(source, 1000)
-        return secrets.randbelow(max_offset)
+        step = self._get_page_size(source)
+        if self._is_paged(source):
+            offset = self.cursors.get((source, category))
+            if offset is not None:
+                return offset
+        return sampling.randbelow(max(max_offset // step, 1)) * step
+
+    def _advance_cursor(self, source: str, category: str, offset: int, fetched: int) -> None:
+        page_size = self._get_page_size(source)
+        next_offset = offset + page_size
+        if fetched < page_size or next_offset >= self.max_offsets.get(source, 1000):
+            next_offset = 0
+        self.cursors[(source, category)] = next_offset
+
+    def _get_fetch_count(self, source: str) -> int:
+        """GIFs handed out per fetch_from_source call"""
+        return 20 if source == "reddit" else 5
+
+    def _get_page_size(self, source: str) -> int:
+        """GIFs requested per upstream call"""
+        if not settings.PAGED_HARVEST:
+            return self._get_fetch_count(source)
+        return max(self.page_sizes.get(source, 0), self._get_fetch_count(source))
 
-    async def get_gifs_from_source(self, source: str, category: str) -> List[Dict]:
-        """Get GIFs from a specific source with source-appropriate offset"""
+    def _is_paged(self, source: str) -> bool:
+        return self._get_page_size(source) > self._get_fetch_count(source)
+
+    async def fetch_from_source(
+        self, source: str, category: str, offset: Optional[int] = None
+    ) -> List[GifRecord]:
+        """
+        Fetch raw GIFs from a specific source with source-appropriate offset.
+        Concurrent calls for the same source, category and offset bucket share
+        one upstream request; without an explicit offset the shared call picks it.
+        Paged sources are served from a per-(source, category) buffer of their
+        last full page unless an explicit offset asks for the whole page.
+        """
         if source not in self.source_functions:
             logger.warning(f"Source {source} not configured")
             return []
 
-        try:
-            seen_gifs = await self.get_seen_gifs(source)
-            offset = self._get_source_offset(source)
-            
-            fetch_count = 20 if source == "reddit" else 5
-            gifs = await self.source_functions[source](fetch_count, category, offset)
-            
-            if not gifs:
-                return []
+        if offset is None and self._is_paged(source):
+            return await self._take_buffered(source, category)
 
-            new_gifs = [gif for gif in gifs if gif["url"] not in seen_gifs]
-            
-            if new_gifs:
-                await self.update_seen_gifs(source, [gif["url"] for gif in new_gifs])
-                return new_gifs[:fetch_count]
-            else:
-                if len(seen_gifs) > 1000:
-                    await cache_set(self._get_session_key(source), [], 86400)
-                return gifs[:fetch_count]
+        bucket = None if offset is None else offset // self._get_page_size(source)
+        return await self.flights.do(
+            (source, category, bucket),
+            lambda: self._fetch_from_source(source, category, offset)
+        )
+
+    async def _take_buffered(self, source: str, category: str) -> List[GifRecord]:
+        """Hand out the next GIFs of a buffered page, fetching a new page when it runs out"""
+        key = (source, category)
+        if not self.buffers.get(key):
+            await self.flights.do(
+                (source, category, None), lambda: self._fill_buffer(source, category)
+            )
+        buffer = self.buffers.get(key)
+        if not buffer:
+            return []
+        return [buffer.popleft() for _ in range(min(self._get_fetch_count(source), len(buffer)))]
+
+    async def _fill_buffer(self, source: str, category: str) -> None:
+        offset = self._get_source_offset(source, category)
+        gifs = await self._fetch_from_source(source, category, offset)
+        if not gifs:
+            return
+        self._advance_cursor(source, category, offset, len(gifs))
+        buffer = self.buffers.setdefault(
+            (source, category), deque(maxlen=settings.PAGE_BUFFER_MAX)
+        )
+        buffer.extend(sampling.shuffle(gifs))
+
+    async def _attempt_source(
+        self, source: str, category: str, offset: int, timeout: float
+    ) -> Optional[List[GifRecord]]:
+        """
+        Make one attempt against a source, recorded by its circuit breaker.
+        Returns None when the breaker refuses the call and raises on failure.
+        """
+        breaker = self.breakers[source]
+        if not breaker.allow():
+            return None
+
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                page_size = self._get_page_size(source)
+                gifs = await self.source_functions[source](page_size, category, offset) or []
+        except QuotaExceededError:
+            breaker.release()
+            raise
+        except BaseException:
+            breaker.record(False, time.monotonic() - start)
+            raise
+        breaker.record(True, time.monotonic() - start)
+        return gifs
 
+    async def _fetch_from_source(
+        self, source: str, category: str, offset: Optional[int]
+    ) -> List[GifRecord]:
+        """
+        Single foreground attempt within the source's budget; failures are
+        retried in the background. Raises FetchFailedError when the provider
+        was not reached, so callers can tell it apart from an empty answer.
+        """
+        if offset is None:
+            offset = self._get_source_offset(source, category)
+        try:
+            gifs = await self._attempt_source(
+                source, category, offset, self.retries.policy(source).foreground_timeout
+            )
+        except QuotaExceededError as e:
+            logger.warning(f"Skipping {source}: {str(e)}")
+        except asyncio.TimeoutError:
+            logger.warning(f"Foreground fetch from {source} exceeded its budget")
         except Exception as e:
             logger.error(f"Error fetching from {source}: {str(e)}")
-            return []
+        else:
+            if gifs is None:
+                raise FetchFailedError(f"{source} circuit is open")
+            return gifs
+        self.retries.schedule(source, category, offset)
+        raise FetchFailedError(f"{source} fetch failed; retrying in the background")
+
+    async def _retry_source(self, source: str, category: str, offset: Optional[int]) -> None:
+        """Background attempt for a failed fetch, keeping its results for later requests"""
+        gifs = await self._attempt_source(source, category, offset, settings.REQUEST_TIMEOUT)
+        if gifs is None:
+            raise ProviderError(f"{source} circuit is open")
+        if not gifs:
+            return
+
+        key = (source, category)
+        if self._is_paged(source) and self.cursors.get(key, offset) == offset:
+            self._advance_cursor(source, category, offset, len(gifs))
+            self.buffers.setdefault(key, deque(maxlen=settings.PAGE_BUFFER_MAX)).extend(
+                sampling.shuffle(gifs)
+            )
+        else:
+            self._keep_surplus(source, category, gifs)
+        if self.catalog is not None:
+            await asyncio.to_thread(self.catalog.add, source, category, gifs)
+
+    async def filter_seen(self, results: List[Tuple[str, List[GifRecord]]]) -> List[List[GifRecord]]:
+        """Prefer unseen GIFs in each (source, gifs) result, checked in one round trip"""
+        pending = [(source, gifs) for source, gifs in results if gifs]
+        flags = await self.mark_seen_batches(
+            [(source, [media_key(gif) for gif in gifs]) for source, gifs in pending]
+        ) if pending else []
+
+        fresh_by_result = iter(flags)
+        filtered = []
+        for source, gifs in results:
+            if not gifs:
+                filtered.append([])
+                continue
+            fresh = next(fresh_by_result)
+            new_gifs = [gif for gif, is_new in zip(gifs, fresh) if is_new]
+            fetch_count = self._get_fetch_count(source)
+            filtered.append(new_gifs[:fetch_count] if new_gifs else gifs[:fetch_count])
+        return filtered
+
+    async def get_gifs_from_source(self, source: str, category: str) -> List[GifRecord]:
+        """Get GIFs from a specific source, preferring ones not seen this session"""
+        gifs = await self.fetch_from_source(source, category)
+        try:
+            return (await self.filter_seen([(source, gifs)]))[0]
+        except Exception as e:
+            logger.error(f"Error checking seen GIFs from {source}: {str(e)}")
+            return gifs
 
-    async def get_gifs(self, count: int, categories: List[str] = None) -> List[Dict]:
-        """Get random GIFs from all sources and categories"""
+    def _expected_yield(self, key: Tuple[str, str]) -> float:
+        """
+        Recent number of new GIFs per call for a (source, category). The
+        estimate drifts back toward the prior while a key is not picked and
+        never drops below a floor, so one bad spell cannot starve a key.
+        """
+        prior = self._get_fetch_count(key[0]) / 2
+        entry = self.yields.get(key)
+        if entry is None:
+            return prior
+        value, updated_at = entry
+        recovery = settings.PLANNER_YIELD_RECOVERY
+        if recovery > 0:
+            value += (prior - value) * (1 - math.exp(-(time.monotonic() - updated_at) / recovery))
+        return max(value, prior * settings.PLANNER_YIELD_FLOOR)
+
+    def _record_yield(self, key: Tuple[str, str], new_gifs: int) -> None:
+        """Fold in the yield of a call that reached the provider"""
+        self.yields[key] = (0.3 * new_gifs + 0.7 * self._expected_yield(key), time.monotonic())
+
+    def plan(self, count: int, categories: List[str], pooled: int = 0) -> FetchPlan:
+        """
+        Pick the fewest (source, category) calls expected to yield the GIFs a
+        request still needs, sampling categories weighted by recent yield and
+        source health. The remaining candidates are kept as a reserve.
+        """
+        plan = FetchPlan(count, pooled)
+        need = count - pooled
+        if need <= 0:
+            return plan
+
+        candidates = [
+            (source, category) for source in self.sources for category in categories
+        ]
+        order = sampling.weighted_sample(candidates, [
+            self._expected_yield(key) * self.breakers[key[0]].weight() for key in candidates
+        ])
+        for index, key in enumerate(order):
+            if plan.calls and (
+                plan.expected >= need * settings.PLANNER_SAFETY
+                or len(plan.calls) >= settings.PLANNER_MAX_CALLS
+            ):
+                plan.reserve = order[index:]
+                break
+            plan.calls.append(key)
+            plan.expected += self._expected_yield(key)
+        return plan
+
+    async def get_gifs(self, count: int, categories: List[str] = None) -> List[GifRecord]:
+        """Get random GIFs from the catalog or pool, with a live fetch fallback"""
+        gifs, _ = await self.get_gifs_planned(count, categories)
+        return gifs
+
+    async def get_gifs_planned(
+        self, count: int, categories: List[str] = None
+    ) -> Tuple[List[GifRecord], FetchPlan]:
+        """Like get_gifs, also returning the fetch plan that served the request"""
         if not categories:
             categories = ["all"]
 
-        shuffled_sources = self._secure_shuffle(self.sources.copy())
-        
-        tasks = []
-        for source in shuffled_sources:
-            for category in categories:
-                tasks.append(self.get_gifs_from_source(source, category))
+        keys = set()
+        pooled = []
+        if self.catalog is not None:
+            pooled = self.dedup.unique(self.catalog.random(count, self.sources, categories), keys)
+        if len(pooled) < count:
+            pooled += self.dedup.unique(self._take_ready(count - len(pooled), categories), keys)
+        plan = self.plan(count, categories, len(pooled))
+        if len(pooled) >= count:
+            return pooled, plan
+
+        live = await self.fetch_gifs(count - len(pooled), categories, exclude=keys, plan=plan)
+        return pooled + live, plan
+
+    async def iter_gifs(
+        self, count: int, categories: List[str] = None
+    ) -> AsyncIterator[GifRecord]:
+        """
+        Yield up to count unique GIFs as soon as they are available: ready
+        catalog and pool GIFs first, then each live fetch result as it arrives.
+        """
+        if not categories:
+            categories = ["all"]
+
+        keys = set()
+        hashes = []
+        pooled = []
+        if self.catalog is not None:
+            pooled = self.dedup.unique(
+                self.catalog.random(count, self.sources, categories), keys, hashes
+            )
+        if len(pooled) < count:
+            pooled += self.dedup.unique(
+                self._take_ready(count - len(pooled), categories), keys, hashes
+            )
+
+        sent = 0
+        for gif in pooled[:count]:
+            sent += 1
+            yield gif
+        if sent >= count:
+            return
+
+        plan = self.plan(count, categories, sent)
+        fetches = self.iter_fetches(
+            plan.calls, count - sent, set(keys), reserve=plan.reserve, plan=plan
+        )
+        try:
+            async for key, gifs in fetches:
+                fresh = (await self.filter_seen([(key[0], gifs)]))[0]
+                fresh = self.dedup.unique(fresh, keys, hashes)
+                self._record_yield(key, len(fresh))
+                for gif in sampling.shuffle(fresh):
+                    sent += 1
+                    yield gif
+                    if sent >= count:
+                        return
+        finally:
+            await fetches.aclose()
+
+    def _hedge_for(
+        self, key: Tuple[str, str], tried: Set[Tuple[str, str]]
+    ) -> Optional[Tuple[str, str]]:
+        """Pick a backup source for a slow (source, category) fetch"""
+        _, category = key
+        for source in self._weighted_sources():
+            if (source, category) not in tried:
+                return source, category
+        return None
+
+    async def iter_fetches(
+        self,
+        keys: List[Tuple[str, str]],
+        count: int,
+        exclude: Set[str] = None,
+        reserve: List[Tuple[str, str]] = None,
+        plan: Optional[FetchPlan] = None,
+    ) -> AsyncIterator[Tuple[Tuple[str, str], List[GifRecord]]]:
+        """
+        Fetch (source, category) keys concurrently, yielding each result as it
+        arrives, until count unique GIFs have arrived or the request budget runs
+        out; the rest are cancelled when iteration stops. Fetches
+        still running after HEDGE_DELAY get a backup source for their category,
+        and reserve keys are drawn on when every fetch finished short.
+        """
+        exclude = exclude or set()
+        reserve = list(reserve or [])
+        plan = plan or FetchPlan(count)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.REQUEST_BUDGET
+        hedge_at = loop.time() + settings.HEDGE_DELAY if settings.HEDGE_DELAY > 0 else None
+
+        pending = {
+            asyncio.create_task(self.fetch_from_source(*key)): key for key in keys
+        }
+        plan.launched += len(pending)
+        tried = set(keys)
+        seen = set(exclude)
+        hashes = []
+        arrived = 0
+
+        try:
+            while arrived < count:
+                if not pending:
+                    expansion = [key for key in reserve if key not in tried][:2]
+                    if not expansion:
+                        break
+                    reserve = reserve[len(expansion):]
+                    for key in expansion:
+                        tried.add(key)
+                        pending[asyncio.create_task(self.fetch_from_source(*key))] = key
+                    plan.launched += len(expansion)
+
+                now = loop.time()
+                if now >= deadline:
+                    logger.warning(f"Request budget spent with {len(pending)} fetches pending")
+                    break
+                wake_at = hedge_at if hedge_at is not None and hedge_at < deadline else deadline
+                done, _ = await asyncio.wait(
+                    pending, timeout=max(wake_at - now, 0),
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    key = pending.pop(task)
+                    try:
+                        gifs = self.dedup.unique(task.result(), seen, hashes)
+                    except FetchFailedError:
+                        # Already logged and queued for retry; not a yield sample
+                        continue
+                    except Exception as e:
+                        logger.error(f"Error fetching from {key[0]}: {str(e)}")
+                        continue
+                    arrived += len(gifs)
+                    yield key, gifs
+
+                if hedge_at is not None and loop.time() >= hedge_at:
+                    hedge_at = None
+                    if arrived < count:
+                        for key in list(pending.values()):
+                            backup = self._hedge_for(key, tried)
+                            if backup:
+                                tried.add(backup)
+                                task = asyncio.create_task(self.fetch_from_source(*backup))
+                                pending[task] = backup
+                                plan.launched += 1
+        finally:
+            FANOUT_WIDTH.observe(plan.launched)
+            for task in pending:
+                task.cancel()
+
+    async def gather_until(
+        self,
+        keys: List[Tuple[str, str]],
+        count: int,
+        exclude: Set[str] = None,
+        reserve: List[Tuple[str, str]] = None,
+        plan: Optional[FetchPlan] = None,
+    ) -> List[Tuple[Tuple[str, str], List[GifRecord]]]:
+        """Collect iter_fetches results once enough GIFs or the budget are reached"""
+        return [
+            result async for result in self.iter_fetches(keys, count, exclude, reserve, plan)
+        ]
+
+    async def fetch_gifs(
+        self,
+        count: int,
+        categories: List[str],
+        exclude: Set[str] = None,
+        plan: Optional[FetchPlan] = None,
+    ) -> List[GifRecord]:
+        """Get random GIFs using the planned sources and categories"""
+        plan = plan or self.plan(count, categories)
 
         try:
-            results = await asyncio.gather(*tasks)
+            arrived = await self.gather_until(
+                plan.calls, count, exclude, reserve=plan.reserve, plan=plan
+            )
+            results = await self.filter_seen(
+                [(source, gifs) for (source, _), gifs in arrived]
+            )
             
             all_gifs = []
-            for result in results:
+            keys = set(exclude or ())
+            hashes = []
+            for (key, _), result in zip(arrived, results):
+                result = self.dedup.unique(result, keys, hashes)
+                self._record_yield(key, len(result))
                 if isinstance(result, list) and result:
-                    all_gifs.extend(result)
+                    all_gifs.extend((key, gif) for gif in result)
 
             if not all_gifs:
                 return []
 
-            shuffled_gifs = self._secure_shuffle(all_gifs)
-            return [{
-                "id": hashlib.md5(gif["url"].encode()).hexdigest(),
-                **gif
-            } for gif in shuffled_gifs[:count]]
+            picked, rest = sampling.partition(all_gifs, count)
+            surplus: Dict[Tuple[str, str], List[GifRecord]] = {}
+            for key, gif in rest:
+                surplus.setdefault(key, []).append(gif)
+            for key, gifs in surplus.items():
+                self._keep_surplus(*key, gifs)
+            return [gif for _, gif in picked]
 
         except Exception as e:
             logger.error(f"Error gathering GIFs: {str(e)}")
-            return []
\ No newline at end of file
+            return []
+
+
+@lru_cache()
+def get_gif_manager() -> GifManager:
+    """
+    Get the shared GifManager instance.
+    Returns:
+        GifManager: Application-wide GIF manager
+    """
+    return GifManager()
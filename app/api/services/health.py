@@ -0,0 +1,106 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """
+    Per-source circuit breaker over a rolling window of call outcomes.
+    Opens when the error rate crosses the threshold, then lets a single
+    half-open probe through after a cool-down to decide whether to close.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        failure_rate: float = 0.5,
+        min_calls: int = 5,
+        open_seconds: float = 30,
+        alpha: float = 0.2,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.alpha = alpha
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.latency_ewma: Optional[float] = None
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+
+    def _probe_due(self) -> bool:
+        return time.monotonic() - self.opened_at >= self.open_seconds
+
+    def available(self) -> bool:
+        """Whether a call would currently be let through"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return self._probe_due()
+        return not self.probe_in_flight
+
+    def allow(self) -> bool:
+        """Admit a call, moving an open circuit to half-open for one probe"""
+        if self.state == OPEN and self._probe_due():
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+        if self.state == HALF_OPEN:
+            if self.probe_in_flight:
+                return False
+            self.probe_in_flight = True
+            return True
+        return self.state == CLOSED
+
+    def release(self) -> None:
+        """Give back an admitted call that never reached the provider"""
+        self.probe_in_flight = False
+
+    def record(self, success: bool, latency: float) -> None:
+        """Record the outcome and latency of an admitted call"""
+        self.latency_ewma = latency if self.latency_ewma is None else (
+            self.alpha * latency + (1 - self.alpha) * self.latency_ewma
+        )
+        self._outcomes.append(success)
+
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            if success:
+                self.state = CLOSED
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls:
+            if self.error_rate() >= self.failure_rate:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+
+    def error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def weight(self) -> float:
+        """Selection weight favouring healthy, fast sources; zero when unavailable"""
+        if not self.available():
+            return 0.0
+        latency = max(self.latency_ewma or 0.5, 0.05)
+        return max(1.0 - self.error_rate(), 0.05) / latency
+
+    def snapshot(self) -> Dict:
+        return {
+            "state": self.state,
+            "error_rate": round(self.error_rate(), 3),
+            "calls": len(self._outcomes),
+            "latency_ewma": round(self.latency_ewma, 4) if self.latency_ewma is not None else None,
+            "weight": round(self.weight(), 3),
+        }
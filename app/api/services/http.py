@@ -0,0 +1,47 @@
+import aiohttp
+import logging
+from typing import Optional
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+_session: Optional[aiohttp.ClientSession] = None
+
+def _create_session(**kwargs) -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_POOL_LIMIT,
+        limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.REQUEST_TIMEOUT,
+        sock_connect=settings.HTTP_CONNECT_TIMEOUT,
+        sock_read=settings.HTTP_READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, **kwargs)
+
+async def start_http_session(**kwargs) -> aiohttp.ClientSession:
+    """Create the application-wide HTTP session"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session(**kwargs)
+    return _session
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the shared HTTP session, creating it lazily outside the app lifespan"""
+    global _session
+    if _session is None or _session.closed:
+        _session = _create_session()
+    return _session
+
+async def close_http_session() -> None:
+    """Close the shared HTTP session and its pooled connections"""
+    global _session
+    if _session is not None and not _session.closed:
+        try:
+            await _session.close()
+        except Exception as e:
+            logger.error(f"Error closing HTTP session: {str(e)}")
+    _session = None
@@ -0,0 +1,143 @@
+import asyncio
+import fcntl
+import logging
+import os
+import secrets
+from typing import Awaitable, Callable, Optional
+from ..core.config import get_settings
+from .cache import get_redis
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class FileLeaderLock:
+    """Leader lock held as an exclusive flock; the OS releases it if the process dies"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    async def acquire(self) -> bool:
+        """Take or keep the lock, returning whether this process holds it"""
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    async def release(self) -> None:
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+class RedisLeaderLock:
+    """Leader lock as a Redis key with a TTL, renewed by its holder; works across hosts"""
+
+    def __init__(self, key: str, ttl: int):
+        self.key = key
+        self.ttl = max(ttl, 2)
+        self.token = secrets.token_hex(8)
+        self._held = False
+
+    async def acquire(self) -> bool:
+        redis = get_redis()
+        if self._held:
+            renewed = await redis.execute(
+                ["EVAL", RENEW_SCRIPT, "1", self.key, self.token, str(self.ttl)]
+            )
+            self._held = bool(renewed)
+        else:
+            result = await redis.execute(
+                ["SET", self.key, self.token, "NX", "EX", str(self.ttl)]
+            )
+            self._held = result == "OK"
+        return self._held
+
+    async def release(self) -> None:
+        if self._held:
+            await get_redis().execute(["EVAL", RELEASE_SCRIPT, "1", self.key, self.token])
+            self._held = False
+
+def create_leader_lock():
+    if settings.LEADER_LOCK == "redis":
+        return RedisLeaderLock("leader_lock", settings.LEADER_LOCK_TTL)
+    return FileLeaderLock(settings.LEADER_LOCK_PATH)
+
+class LeaderElector:
+    """
+    Periodically tries to take or renew the leader lock, running on_elected
+    when this process becomes leader and on_demoted if it loses the lock.
+    """
+
+    def __init__(
+        self,
+        lock,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        interval: float = settings.LEADER_CHECK_INTERVAL,
+    ):
+        self.lock = lock
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.interval = interval
+        self.is_leader = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> bool:
+        """Run one election round"""
+        try:
+            held = await self.lock.acquire()
+        except Exception as e:
+            logger.error(f"Error checking leader lock: {str(e)}")
+            held = False
+        if held and not self.is_leader:
+            self.is_leader = True
+            logger.info(f"Process {os.getpid()} elected leader")
+            await self.on_elected()
+        elif not held and self.is_leader:
+            self.is_leader = False
+            logger.warning(f"Process {os.getpid()} lost leadership")
+            await self.on_demoted()
+        return self.is_leader
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    async def start(self) -> None:
+        await self.check()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_leader:
+            self.is_leader = False
+            await self.on_demoted()
+        await self.lock.release()
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+from typing import Optional
+from prometheus_client import Counter, Gauge, Histogram
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20)
+CACHE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+UPSTREAM_LATENCY = Histogram(
+    "asciime_upstream_latency_seconds",
+    "Latency of a single provider search attempt on a cache miss",
+    ["source", "category"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "asciime_upstream_errors_total",
+    "Provider search attempts that raised, foreground or background",
+    ["source"],
+)
+UPSTREAM_RETRIES = Counter(
+    "asciime_upstream_retries_total",
+    "Background retries of failed provider fetches",
+    ["source"],
+)
+CACHE_LATENCY = Histogram(
+    "asciime_cache_latency_seconds",
+    "Upstash REST round-trip latency",
+    ["endpoint"],
+    buckets=CACHE_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "asciime_cache_lookups_total",
+    "cache_get lookups by tier that answered and result",
+    ["tier", "result"],
+)
+FANOUT_WIDTH = Histogram(
+    "asciime_fanout_width",
+    "Upstream fetches launched per request, including hedges and reserves",
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24),
+)
+POOL_DEPTH = Gauge(
+    "asciime_pool_depth",
+    "Ready GIFs in the pre-warmed pool",
+    ["source", "category"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "asciime_event_loop_lag_seconds",
+    "Delay between a scheduled wake-up and the event loop running it",
+    buckets=LAG_BUCKETS,
+)
+
+_lag_task: Optional[asyncio.Task] = None
+
+async def _monitor_loop_lag(interval: float) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - start - interval, 0))
+
+def start_loop_monitor() -> None:
+    """Start sampling event-loop lag"""
+    global _lag_task
+    if settings.METRICS_LOOP_INTERVAL <= 0:
+        return
+    if _lag_task is None or _lag_task.done():
+        _lag_task = asyncio.create_task(_monitor_loop_lag(settings.METRICS_LOOP_INTERVAL))
+
+async def stop_loop_monitor() -> None:
+    global _lag_task
+    if _lag_task:
+        _lag_task.cancel()
+        await asyncio.gather(_lag_task, return_exceptions=True)
+        _lag_task = None
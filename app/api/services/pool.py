@@ -0,0 +1,159 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from ..core.config import get_settings
+from ..models.gif import GifRecord, decode_records
+from .cache import cache_list_pop, cache_list_push
+from .dedup import media_key
+from .errors import FetchFailedError
+from . import sampling
+from .metrics import POOL_DEPTH
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PoolKey = Tuple[str, str]
+FetchFunction = Callable[[str, str], Awaitable[List[GifRecord]]]
+
+MAX_REFILL_ROUNDS = 5
+
+class GifPool:
+    """Pre-warmed GIFs per (source, category), refilled in the background"""
+
+    def __init__(
+        self,
+        fetch: FetchFunction,
+        low_watermark: int = settings.POOL_LOW_WATERMARK,
+        high_watermark: int = settings.POOL_HIGH_WATERMARK,
+        concurrency: int = settings.POOL_REFILL_CONCURRENCY,
+        redis_backed: bool = settings.POOL_REDIS_BACKED,
+    ):
+        self._fetch = fetch
+        self.low_watermark = low_watermark
+        self.high_watermark = max(high_watermark, low_watermark + 1)
+        self.redis_backed = redis_backed
+        self._pools: Dict[PoolKey, Deque[GifRecord]] = {}
+        self._keys: Dict[PoolKey, Set[str]] = {}
+        self._refills: Dict[PoolKey, asyncio.Task] = {}
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._closed = False
+
+    def _redis_key(self, key: PoolKey) -> str:
+        return f"pool_{key[0]}_{key[1]}"
+
+    def depth(self, source: str, category: str) -> int:
+        """Number of ready GIFs for a source and category"""
+        pool = self._pools.get((source, category))
+        return len(pool) if pool else 0
+
+    def _add(self, key: PoolKey, gifs: List[GifRecord]) -> List[GifRecord]:
+        """Add GIFs to a pool up to the high watermark, returning the overflow"""
+        pool = self._pools.setdefault(key, deque())
+        known = self._keys.setdefault(key, set())
+        overflow = []
+        for gif in gifs:
+            gif_key = media_key(gif)
+            if gif_key in known:
+                continue
+            if len(pool) >= self.high_watermark:
+                overflow.append(gif)
+                continue
+            pool.append(gif)
+            known.add(gif_key)
+        POOL_DEPTH.labels(*key).set(len(pool))
+        return overflow
+
+    def put(self, source: str, category: str, gifs: List[GifRecord]) -> None:
+        """Keep surplus GIFs from a live fetch for later requests"""
+        self._add((source, category), gifs)
+
+    def pop(self, source: str, category: str) -> Optional[GifRecord]:
+        """Pop one ready GIF, scheduling a refill when the pool runs low"""
+        key = (source, category)
+        pool = self._pools.get(key)
+        gif = None
+        if pool:
+            gif = pool.popleft()
+            self._keys[key].discard(media_key(gif))
+            POOL_DEPTH.labels(source, category).set(len(pool))
+        if not pool or len(pool) < self.low_watermark:
+            self.schedule_refill(source, category)
+        return gif
+
+    def take(self, count: int, sources: List[str], categories: List[str]) -> List[GifRecord]:
+        """Take up to count unique GIFs spread across the given sources and categories"""
+        keys = [(source, category) for source in sources for category in categories]
+        for source, category in keys:
+            if self.depth(source, category) < self.low_watermark:
+                self.schedule_refill(source, category)
+
+        gifs = []
+        taken = set()
+        while len(gifs) < count:
+            ready = [key for key in keys if self._pools.get(key)]
+            if not ready:
+                break
+            gif = self.pop(*ready[sampling.randbelow(len(ready))])
+            if gif and media_key(gif) not in taken:
+                taken.add(media_key(gif))
+                gifs.append(gif)
+        return gifs
+
+    def schedule_refill(self, source: str, category: str) -> None:
+        """Start a background refill unless one is already running"""
+        key = (source, category)
+        if self._closed:
+            return
+        task = self._refills.get(key)
+        if task and not task.done():
+            return
+        try:
+            self._refills[key] = asyncio.create_task(self.refill(source, category))
+        except RuntimeError:
+            logger.warning("No running event loop, skipping pool refill")
+
+    async def refill(self, source: str, category: str) -> None:
+        """Fill a pool up to its high watermark from Redis, then from the source"""
+        key = (source, category)
+        async with self._semaphore:
+            try:
+                if self.redis_backed:
+                    missing = self.high_watermark - self.depth(source, category)
+                    if missing > 0:
+                        rows = await cache_list_pop(self._redis_key(key), missing)
+                        self._add(key, decode_records(rows))
+
+                for _ in range(MAX_REFILL_ROUNDS):
+                    if self.depth(source, category) >= self.high_watermark:
+                        break
+                    before = self.depth(source, category)
+                    overflow = self._add(key, await self._fetch(source, category))
+                    if overflow and self.redis_backed:
+                        await cache_list_push(
+                            self._redis_key(key),
+                            [gif.to_row() for gif in overflow],
+                            settings.POOL_REDIS_EXPIRY,
+                        )
+                    if self.depth(source, category) == before:
+                        break
+            except FetchFailedError:
+                # Logged and retried in the background by the fetch itself
+                pass
+            except Exception as e:
+                logger.error(f"Error refilling pool for {source}/{category}: {str(e)}")
+
+    def warm(self, sources: List[str], categories: List[str]) -> None:
+        """Schedule refills for every source and category"""
+        for source in sources:
+            for category in categories:
+                self.schedule_refill(source, category)
+
+    async def close(self) -> None:
+        """Cancel running refills"""
+        self._closed = True
+        tasks = [task for task in self._refills.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refills.clear()
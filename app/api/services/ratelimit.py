@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Dict, Optional, Tuple
+from ..core.config import get_settings
+from .cache import get_redis
+from .errors import QuotaExceededError
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) / 1000 * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return wait
+"""
+
+class TokenBucket:
+    """Token bucket refilled at rate tokens per second up to burst"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self) -> float:
+        """Take a token, returning 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket whose state lives in Redis so workers and nodes share one quota"""
+
+    def __init__(self, key: str, rate: float, burst: int):
+        super().__init__(rate, burst)
+        self.key = key
+
+    async def try_acquire_shared(self) -> float:
+        result = await get_redis().execute([
+            "EVAL", TOKEN_BUCKET_SCRIPT, "1", self.key,
+            str(self.rate), str(self.burst), str(int(time.time() * 1000)),
+        ])
+        if result is None:
+            # Redis unavailable: enforce the quota locally instead of failing open
+            return self.try_acquire()
+        return int(result) / 1000
+
+class ProviderRateLimiter:
+    """Client-side token buckets per provider and API key"""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.limits = {
+            "tenor": (settings.TENOR_RATE_LIMIT, settings.TENOR_RATE_BURST),
+            "giphy": (settings.GIPHY_RATE_LIMIT, settings.GIPHY_RATE_BURST),
+            "reddit": (settings.REDDIT_RATE_LIMIT, settings.REDDIT_RATE_BURST),
+        }
+
+    def bucket(self, provider: str, api_key: Optional[str]) -> TokenBucket:
+        key_id = hashlib.blake2b((api_key or "").encode(), digest_size=6).hexdigest()
+        bucket = self._buckets.get((provider, key_id))
+        if bucket is None:
+            rate, burst = self.limits.get(provider, (1.0, 1))
+            if settings.RATE_LIMIT_REDIS:
+                bucket = SharedTokenBucket(f"ratelimit_{provider}_{key_id}", rate, burst)
+            else:
+                bucket = TokenBucket(rate, burst)
+            self._buckets[(provider, key_id)] = bucket
+        return bucket
+
+    async def acquire(
+        self, provider: str, api_key: Optional[str], max_wait: Optional[float] = None
+    ) -> None:
+        """
+        Take one call's worth of quota, queueing for at most max_wait seconds.
+        Raises QuotaExceededError when the quota is not available in time;
+        a max_wait of 0 fails fast.
+        """
+        if max_wait is None:
+            max_wait = settings.RATE_LIMIT_MAX_WAIT
+        bucket = self.bucket(provider, api_key)
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            if isinstance(bucket, SharedTokenBucket):
+                wait = await bucket.try_acquire_shared()
+            else:
+                wait = bucket.try_acquire()
+            if wait <= 0:
+                return
+            if time.monotonic() + wait > deadline:
+                raise QuotaExceededError(f"{provider} quota exhausted, retry in {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+rate_limiter = ProviderRateLimiter()
+
+async def acquire_quota(
+    provider: str, api_key: Optional[str] = None, max_wait: Optional[float] = None
+) -> None:
+    """Take quota for one upstream call to a provider"""
+    await rate_limiter.acquire(provider, api_key, max_wait)
@@ -1,21 +1,30 @@
 import os
 import asyncpraw
-import random
 import logging
-from typing import List, Dict, Optional
+import time
+from typing import Dict, List, Optional, Set, Tuple
 import asyncio
-from tenacity import retry, stop_after_attempt, wait_exponential
 from ..core.config import get_settings
-from ..models.categories import CATEGORIES
+from ..models.gif import GifRecord
+from .categories import get_registry
+from .errors import QuotaExceededError
+from .metrics import UPSTREAM_ERRORS, UPSTREAM_LATENCY
+from .ratelimit import acquire_quota
+from . import sampling
 
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_reddit: Optional[asyncpraw.Reddit] = None
+_listings: Dict[str, Tuple[float, List[GifRecord]]] = {}
+_listing_fetches: Dict[str, asyncio.Task] = {}
+_awaiting_quota: Set[str] = set()
+_refresh_task: Optional[asyncio.Task] = None
+
 def get_category_subreddits(category_id: str) -> List[str]:
     """Get subreddits for a given category ID"""
-    category = next((cat for cat in CATEGORIES if cat["id"] == category_id), None)
-    return category.get("subreddits", ["animegifs"]) if category else ["animegifs"]
+    return list(get_registry().get(category_id).subreddits)
 
 async def init_reddit() -> asyncpraw.Reddit:
     """Initialize Reddit API client"""
@@ -28,22 +37,42 @@ async def init_reddit() -> asyncpraw.Reddit:
             client_secret=settings.REDDIT_CLIENT_SECRET,
             user_agent="AnimeGifAPI/1.0",
             timeout=settings.REQUEST_TIMEOUT,
+            oauth_url=settings.REDDIT_OAUTH_URL,
+            reddit_url=settings.REDDIT_URL,
         )
     except Exception as e:
         logger.error(f"Failed to initialize Reddit client: {str(e)}")
         raise
 
+async def get_reddit_client() -> asyncpraw.Reddit:
+    """Get the long-lived Reddit client, creating it on first use"""
+    global _reddit
+    if _reddit is None:
+        _reddit = await init_reddit()
+    return _reddit
+
+async def close_reddit() -> None:
+    """Stop listing refreshes and close the shared Reddit client"""
+    global _reddit
+    await stop_listing_refresh()
+    if _reddit:
+        try:
+            await _reddit.close()
+        except Exception as e:
+            logger.error(f"Error closing Reddit instance: {str(e)}")
+    _reddit = None
+
 async def fetch_subreddit_posts(
-    reddit: asyncpraw.Reddit, 
-    subreddit_name: str, 
+    reddit: asyncpraw.Reddit,
+    subreddit_name: str,
     limit: int
-) -> List[Dict]:
+) -> List[GifRecord]:
     """Fetch posts from a specific subreddit"""
     try:
         gifs = []
         subreddit = await reddit.subreddit(subreddit_name)
-        
-        async with asyncio.timeout(15.0):
+
+        async with asyncio.timeout(settings.REDDIT_LISTING_TIMEOUT):
             async for post in subreddit.hot(limit=limit):
                 if not hasattr(post, "url"):
                     continue
@@ -53,16 +82,14 @@ async def fetch_subreddit_posts(
                     continue
 
                 url = url.replace(".gifv", ".gif")
-                
-                gifs.append({
-                    "url": url,
-                    "preview": url,
-                    "size": None,
-                    "dims": None,
-                    "source": "reddit",
-                    "title": getattr(post, "title", ""),
-                    "subreddit": subreddit_name,
-                })
+
+                gifs.append(GifRecord.create(
+                    url=url,
+                    source="reddit",
+                    preview=url,
+                    title=getattr(post, "title", ""),
+                    subreddit=subreddit_name,
+                ))
 
         return gifs
     except asyncio.TimeoutError:
@@ -72,53 +99,133 @@ async def fetch_subreddit_posts(
         logger.error(f"Error fetching from r/{subreddit_name}: {str(e)}")
         return []
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=10),
-    retry_error_callback=lambda _: []
-)
+async def _refresh_listing(subreddit_name: str, has_quota: bool = False) -> List[GifRecord]:
+    """Re-pull the hot listing of a subreddit into the listing cache"""
+    try:
+        if not has_quota:
+            _awaiting_quota.add(subreddit_name)
+            try:
+                await acquire_quota(
+                    "reddit", settings.REDDIT_CLIENT_ID, settings.REDDIT_LISTING_TIMEOUT
+                )
+            finally:
+                _awaiting_quota.discard(subreddit_name)
+        reddit = await get_reddit_client()
+        gifs = await fetch_subreddit_posts(reddit, subreddit_name, settings.REDDIT_LISTING_LIMIT)
+    except Exception as e:
+        logger.error(f"Error refreshing r/{subreddit_name}: {str(e)}")
+        gifs = []
+    if gifs:
+        _listings[subreddit_name] = (time.monotonic(), gifs)
+        return gifs
+    cached = _listings.get(subreddit_name)
+    return cached[1] if cached else []
+
+def _schedule_listing_refresh(subreddit_name: str, has_quota: bool = False) -> asyncio.Task:
+    """Start a listing refresh unless one is already in flight"""
+    task = _listing_fetches.get(subreddit_name)
+    if task is None or task.done():
+        task = asyncio.create_task(_refresh_listing(subreddit_name, has_quota))
+        _listing_fetches[subreddit_name] = task
+    return task
+
+async def get_subreddit_listing(subreddit_name: str) -> List[GifRecord]:
+    """
+    Get cached GIF posts for a subreddit, refreshing stale listings in the
+    background. A cold listing is fetched in the foreground only when quota
+    is available right away; otherwise QuotaExceededError is raised rather
+    than queueing the caller behind the rate limiter.
+    """
+    cached = _listings.get(subreddit_name)
+    if cached is None:
+        task = _listing_fetches.get(subreddit_name)
+        if task is None or task.done():
+            await acquire_quota("reddit", settings.REDDIT_CLIENT_ID, 0)
+            task = _schedule_listing_refresh(subreddit_name, has_quota=True)
+        elif subreddit_name in _awaiting_quota:
+            raise QuotaExceededError(f"reddit quota exhausted, r/{subreddit_name} is queued")
+        return await asyncio.shield(task)
+
+    fetched_at, gifs = cached
+    if time.monotonic() - fetched_at > settings.REDDIT_LISTING_TTL:
+        _schedule_listing_refresh(subreddit_name)
+    return gifs
+
+def _all_subreddits() -> List[str]:
+    return list(get_registry().subreddits)
+
+async def _refresh_loop() -> None:
+    while True:
+        tasks = [_schedule_listing_refresh(name) for name in _all_subreddits()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.sleep(settings.REDDIT_REFRESH_INTERVAL)
+
+def start_listing_refresh() -> None:
+    """Start re-pulling hot listings for every known subreddit on a schedule"""
+    global _refresh_task
+    if not settings.REDDIT_CLIENT_ID or not settings.REDDIT_CLIENT_SECRET:
+        logger.warning("Reddit credentials missing, listing refresh disabled")
+        return
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop())
+
+async def stop_listing_refresh() -> None:
+    """Cancel the scheduled and in-flight listing refreshes"""
+    global _refresh_task
+    tasks = [task for task in _listing_fetches.values() if not task.done()]
+    if _refresh_task:
+        tasks.append(_refresh_task)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    _listing_fetches.clear()
+    _refresh_task = None
+
 async def get_reddit_gifs(
     limit: int = 20,
     category: str = "all",
     offset: int = 0
-) -> List[Dict]:
-    """Fetch anime GIFs from Reddit"""
-    reddit = None
+) -> List[GifRecord]:
+    """
+    Sample anime GIFs from cached subreddit listings (offset is kept for API
+    parity). Samples are not cached in Redis: the listing cache already is
+    the cache, and a stored sample would pin every request to it.
+    """
     try:
-        reddit = await init_reddit()
         subreddit_names = get_category_subreddits(category)
-        
-        tasks = [
-            fetch_subreddit_posts(reddit, subreddit, min(limit * 2, 50))
-            for subreddit in subreddit_names
-        ]
-        
-        async with asyncio.timeout(settings.REQUEST_TIMEOUT):
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        all_gifs = []
+
+        async with asyncio.timeout(settings.REQUEST_BUDGET):
+            with UPSTREAM_LATENCY.labels("reddit", category).time():
+                results = await asyncio.gather(
+                    *[get_subreddit_listing(name) for name in subreddit_names],
+                    return_exceptions=True
+                )
+
+        all_gifs = {}
+        quota_error = None
         for result in results:
             if isinstance(result, list):
-                all_gifs.extend(result)
-        
+                for gif in result:
+                    all_gifs.setdefault(gif.url, gif)
+            elif isinstance(result, QuotaExceededError):
+                quota_error = result
+
         if all_gifs:
-            random.shuffle(all_gifs)
-            if offset >= len(all_gifs):
-                offset = 0
-            end_idx = min(offset + limit, len(all_gifs))
-            return all_gifs[offset:end_idx]
-            
+            sampled = sampling.sample(list(all_gifs.values()), limit)
+            return [gif.with_category(category) for gif in sampled]
+        if quota_error is not None:
+            # Nothing cached yet: report quota, not an empty or failed provider
+            raise quota_error
+
         return []
 
     except asyncio.TimeoutError:
         logger.error("Timeout in get_reddit_gifs")
-        return []
+        UPSTREAM_ERRORS.labels("reddit").inc()
+        raise
+    except QuotaExceededError:
+        raise
     except Exception as e:
         logger.error(f"Error in get_reddit_gifs: {str(e)}")
+        UPSTREAM_ERRORS.labels("reddit").inc()
         raise
-    finally:
-        if reddit:
-            try:
-                await reddit.close()
-            except Exception as e:
-                logger.error(f"Error closing Reddit instance: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,153 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from ..core.config import get_settings
+from .metrics import UPSTREAM_RETRIES
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RetryKey = Tuple[str, str, Optional[int]]
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How a source is retried: one bounded foreground attempt, then background retries"""
+    attempts: int
+    base_delay: float
+    max_delay: float
+    foreground_timeout: float
+
+    def backoff(self, attempt: int) -> float:
+        """Equal-jitter exponential delay before the given background attempt (1-based)"""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return cap / 2 + random.uniform(0, cap / 2)
+
+def get_retry_policy(source: str) -> RetryPolicy:
+    prefix = source.upper()
+    return RetryPolicy(
+        attempts=getattr(settings, f"{prefix}_RETRY_ATTEMPTS", 3),
+        base_delay=getattr(settings, f"{prefix}_RETRY_BASE_DELAY", 2.0),
+        max_delay=getattr(settings, f"{prefix}_RETRY_MAX_DELAY", 60.0),
+        foreground_timeout=getattr(settings, f"{prefix}_FOREGROUND_TIMEOUT", settings.PROVIDER_TIMEOUT),
+    )
+
+class RetryWorker:
+    """
+    Re-runs failed fetches in the background with jittered backoff, so user
+    requests never wait on retries. Each (source, category, offset) is queued
+    at most once.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, str, Optional[int]], Awaitable[object]],
+        max_queue: int = settings.RETRY_QUEUE_MAX,
+    ):
+        self._fetch = fetch
+        self.max_queue = max(max_queue, 1)
+        self.policies: Dict[str, RetryPolicy] = {}
+        self._heap: List[Tuple[float, int, RetryKey, int]] = []
+        self._queued: Set[RetryKey] = set()
+        self._order = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._attempts: Set[asyncio.Task] = set()
+        self._closed = False
+        self.scheduled = 0
+        self.succeeded = 0
+        self.exhausted = 0
+        self.dropped = 0
+
+    def policy(self, source: str) -> RetryPolicy:
+        policy = self.policies.get(source)
+        if policy is None:
+            policy = self.policies[source] = get_retry_policy(source)
+        return policy
+
+    def schedule(self, source: str, category: str, offset: Optional[int] = None, attempt: int = 1) -> bool:
+        """Queue a background attempt, returning False when it was not queued"""
+        key = (source, category, offset)
+        if self._closed or key in self._queued:
+            return False
+        policy = self.policy(source)
+        if attempt > policy.attempts:
+            self.exhausted += 1
+            logger.warning(f"Giving up on {source}/{category} after {policy.attempts} background retries")
+            return False
+        if len(self._queued) >= self.max_queue:
+            self.dropped += 1
+            return False
+        try:
+            self._start()
+        except RuntimeError:
+            return False
+
+        due = time.monotonic() + policy.backoff(attempt)
+        heapq.heappush(self._heap, (due, next(self._order), key, attempt))
+        self._queued.add(key)
+        self.scheduled += 1
+        self._wakeup.set()
+        return True
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0][0] - time.monotonic()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, key, attempt = heapq.heappop(self._heap)
+            self._queued.discard(key)
+            task = asyncio.create_task(self._attempt(key, attempt))
+            self._attempts.add(task)
+            task.add_done_callback(self._attempts.discard)
+
+    async def _attempt(self, key: RetryKey, attempt: int) -> None:
+        source, category, offset = key
+        UPSTREAM_RETRIES.labels(source).inc()
+        try:
+            await self._fetch(source, category, offset)
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Background retry {attempt} of {source}/{category} failed: {str(e)}")
+            self.schedule(source, category, offset, attempt + 1)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queued": len(self._queued),
+            "running": len(self._attempts),
+            "scheduled": self.scheduled,
+            "succeeded": self.succeeded,
+            "exhausted": self.exhausted,
+            "dropped": self.dropped,
+        }
+
+    async def close(self) -> None:
+        """Cancel the worker and any running attempts"""
+        self._closed = True
+        tasks = list(self._attempts)
+        if self._task:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._heap.clear()
+        self._queued.clear()
@@ -0,0 +1,107 @@
+import heapq
+import os
+from array import array
+from typing import Callable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+WORD_BITS = 64
+FLOAT_SCALE = 1 / (1 << 53)
+
+class SecureSampler:
+    """
+    Cryptographically secure sampling with entropy read from os.urandom in
+    blocks of 64-bit words, instead of one syscall-backed secrets call per
+    draw. Not thread-safe; use one sampler per thread.
+    """
+
+    def __init__(self, block_words: int = 512):
+        self.block_words = max(block_words, 1)
+        self._words = array("Q")
+        self._index = 0
+
+    def reset(self) -> None:
+        """Discard buffered entropy, e.g. in a forked child that shares the parent's buffer"""
+        self._words = array("Q")
+        self._index = 0
+
+    def _word(self) -> int:
+        if self._index >= len(self._words):
+            self._words = array("Q", os.urandom(self.block_words * 8))
+            self._index = 0
+        word = self._words[self._index]
+        self._index += 1
+        return word
+
+    def randbelow(self, n: int) -> int:
+        """Uniform integer in [0, n) without modulo bias"""
+        if n <= 1:
+            return 0
+        # Reject the top partial range so every residue is equally likely
+        limit = (1 << WORD_BITS) - (1 << WORD_BITS) % n
+        word = self._word()
+        while word >= limit:
+            word = self._word()
+        return word % n
+
+    def random(self) -> float:
+        """Uniform float in (0, 1]"""
+        return ((self._word() >> 11) + 1) * FLOAT_SCALE
+
+    def sample(self, items: Sequence[T], count: int) -> List[T]:
+        """
+        Up to count distinct items in random order, by a partial Fisher-Yates
+        over swapped indices. Costs O(count) draws and memory whatever the size
+        of items, so ranges and large lists are not copied.
+        """
+        n = len(items)
+        k = min(max(count, 0), n)
+        swaps = {}
+        picked = []
+        for i in range(k):
+            j = i + self.randbelow(n - i)
+            picked.append(items[swaps.get(j, j)])
+            swaps[j] = swaps.get(i, i)
+        return picked
+
+    def partition(self, items: Sequence[T], count: int) -> Tuple[List[T], List[T]]:
+        """Split items into count random picks and the rest, in one partial shuffle"""
+        pool = list(items)
+        n = len(pool)
+        k = min(max(count, 0), n)
+        for i in range(k):
+            j = i + self.randbelow(n - i)
+            pool[i], pool[j] = pool[j], pool[i]
+        return pool[:k], pool[k:]
+
+    def shuffle(self, items: Sequence[T]) -> List[T]:
+        """Shuffled copy of items"""
+        return self.partition(items, len(items))[0]
+
+    def weighted_sample(
+        self, items: Sequence[T], weights: Sequence[float], count: Optional[int] = None
+    ) -> List[T]:
+        """
+        Items with positive weight sampled without replacement, heavier ones
+        earlier more often (Efraimidis-Spirakis keys u ** (1 / w)). Returns
+        every positive-weight item in that order when count is None.
+        """
+        keyed = [
+            (self.random() ** (1 / weight), i)
+            for i, weight in enumerate(weights) if weight > 0
+        ]
+        if count is None or count >= len(keyed):
+            keyed.sort(reverse=True)
+        else:
+            keyed = heapq.nlargest(count, keyed)
+        return [items[i] for _, i in keyed]
+
+_sampler = SecureSampler()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_sampler.reset)
+
+randbelow: Callable[[int], int] = _sampler.randbelow
+sample = _sampler.sample
+partition = _sampler.partition
+shuffle = _sampler.shuffle
+weighted_sample = _sampler.weighted_sample
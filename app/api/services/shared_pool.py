@@ -0,0 +1,250 @@
+import fcntl
+import logging
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+import orjson
+from ..models.gif import GifRecord
+from . import sampling
+
+logger = logging.getLogger(__name__)
+
+RingKey = Tuple[str, str]
+
+MAGIC = b"GIFRING2"
+FILE_HEADER = struct.Struct("<8sIII")
+KEY_COUNT = struct.Struct("<I")
+KEY_COUNT_OFFSET = FILE_HEADER.size
+RING_HEADER = struct.Struct("<QQ")
+SLOT_LENGTH = struct.Struct("<I")
+HEADER_SIZE = 64
+KEY_SIZE = 64
+RING_HEADER_SIZE = 64
+
+class SharedGifRing:
+    """
+    Fixed-size ring buffers of ready GIFs per (source, category) in one
+    memory-mapped file, shared by every worker process on the host.
+
+    The file layout depends only on max_keys, slots and slot_size. A
+    directory of key names assigns rings on first push, so categories added
+    by a registry reload get a ring without any worker remapping the file.
+    Each ring keeps monotonically increasing write and read sequence
+    numbers; updates take a byte-range lock on the ring's header so any
+    process can push or pop.
+    """
+
+    def __init__(self, path: str, max_keys: int, slots: int, slot_size: int):
+        self.path = path
+        self.max_keys = max(max_keys, 1)
+        self.slots = max(slots, 1)
+        self.slot_size = max(slot_size, 64)
+        self.index: Dict[RingKey, int] = {}
+        self.size = (
+            HEADER_SIZE
+            + self.max_keys * (KEY_SIZE + RING_HEADER_SIZE)
+            + self.max_keys * self.slots * self.slot_size
+        )
+        self._fd: Optional[int] = None
+        self._map: Optional[mmap.mmap] = None
+        self._full_logged = False
+
+    def open(self) -> None:
+        """Map the ring file, creating it or replacing it when its layout does not match"""
+        if self._map is not None:
+            return
+        expected = FILE_HEADER.pack(MAGIC, self.max_keys, self.slots, self.slot_size)
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                replaced = os.fstat(fd).st_ino != os.stat(self.path).st_ino
+            except FileNotFoundError:
+                replaced = True
+            if not replaced:
+                break
+            # Another process swapped the file in while we waited for the lock
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+        try:
+            size = os.fstat(fd).st_size
+            if size == 0:
+                # Nobody maps an empty file, so it can be sized in place
+                os.ftruncate(fd, self.size)
+                os.pwrite(fd, expected, 0)
+                logger.info(f"Initialized shared GIF ring at {self.path}")
+            elif os.pread(fd, FILE_HEADER.size, 0) != expected or size != self.size:
+                # Other processes may still map the old file; swap in a new one
+                # instead of truncating pages out from under them
+                old_fd, fd = fd, self._replace(expected)
+                fcntl.flock(old_fd, fcntl.LOCK_UN)
+                os.close(old_fd)
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, self.size)
+        self.index.clear()
+        self._sync_keys()
+
+    def _replace(self, header: bytes) -> int:
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(fd, self.size)
+        os.pwrite(fd, header, 0)
+        os.replace(tmp_path, self.path)
+        logger.warning(f"Replaced shared GIF ring at {self.path} with a new layout")
+        return fd
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self.index.clear()
+
+    def _key_offset(self, ring: int) -> int:
+        return HEADER_SIZE + ring * KEY_SIZE
+
+    def _header_offset(self, ring: int) -> int:
+        return HEADER_SIZE + self.max_keys * KEY_SIZE + ring * RING_HEADER_SIZE
+
+    def _slot_offset(self, ring: int, seq: int) -> int:
+        return (
+            HEADER_SIZE
+            + self.max_keys * (KEY_SIZE + RING_HEADER_SIZE)
+            + (ring * self.slots + seq % self.slots) * self.slot_size
+        )
+
+    def _sync_keys(self) -> int:
+        """Pick up rings other processes registered, returning the key count"""
+        if self._map is None:
+            return 0
+        (count,) = KEY_COUNT.unpack_from(self._map, KEY_COUNT_OFFSET)
+        count = min(count, self.max_keys)
+        for ring in range(len(self.index), count):
+            offset = self._key_offset(ring)
+            length = self._map[offset]
+            source, _, category = bytes(self._map[offset + 1:offset + 1 + length]).decode().partition(":")
+            self.index[(source, category)] = ring
+        return count
+
+    def _ring(self, source: str, category: str, create: bool = False) -> Optional[int]:
+        key = (source, category)
+        ring = self.index.get(key)
+        if ring is not None or self._map is None:
+            return ring
+        self._sync_keys()
+        ring = self.index.get(key)
+        if ring is not None or not create:
+            return ring
+
+        name = f"{source}:{category}".encode()
+        if len(name) >= KEY_SIZE:
+            return None
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, KEY_COUNT.size, KEY_COUNT_OFFSET)
+        try:
+            count = self._sync_keys()
+            ring = self.index.get(key)
+            if ring is not None:
+                return ring
+            if count >= self.max_keys:
+                if not self._full_logged:
+                    self._full_logged = True
+                    logger.warning(f"Shared GIF ring has no free slot for {source}/{category}")
+                return None
+            offset = self._key_offset(count)
+            self._map[offset] = len(name)
+            self._map[offset + 1:offset + 1 + len(name)] = name
+            KEY_COUNT.pack_into(self._map, KEY_COUNT_OFFSET, count + 1)
+            self.index[key] = count
+            return count
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, KEY_COUNT.size, KEY_COUNT_OFFSET)
+
+    def _lock(self, ring: int) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, self._header_offset(ring))
+
+    def _unlock(self, ring: int) -> None:
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, self._header_offset(ring))
+
+    def depth(self, source: str, category: str) -> int:
+        """Approximate number of ready GIFs, read without locking"""
+        ring = self._ring(source, category)
+        if ring is None:
+            return 0
+        write_seq, read_seq = RING_HEADER.unpack_from(self._map, self._header_offset(ring))
+        return max(write_seq - read_seq, 0)
+
+    def push(self, source: str, category: str, gifs: List[GifRecord]) -> int:
+        """Append GIFs until the ring is full, returning how many were stored"""
+        if not gifs:
+            return 0
+        ring = self._ring(source, category, create=True)
+        if ring is None:
+            return 0
+        payloads = []
+        for gif in gifs:
+            payload = orjson.dumps(gif.to_row())
+            if len(payload) + SLOT_LENGTH.size <= self.slot_size:
+                payloads.append(payload)
+
+        header = self._header_offset(ring)
+        self._lock(ring)
+        try:
+            write_seq, read_seq = RING_HEADER.unpack_from(self._map, header)
+            free = self.slots - (write_seq - read_seq)
+            stored = payloads[:max(free, 0)]
+            for payload in stored:
+                offset = self._slot_offset(ring, write_seq)
+                SLOT_LENGTH.pack_into(self._map, offset, len(payload))
+                self._map[offset + SLOT_LENGTH.size:offset + SLOT_LENGTH.size + len(payload)] = payload
+                write_seq += 1
+            RING_HEADER.pack_into(self._map, header, write_seq, read_seq)
+        finally:
+            self._unlock(ring)
+        return len(stored)
+
+    def pop(self, source: str, category: str, count: int) -> List[GifRecord]:
+        """Remove up to count GIFs from the head of a ring"""
+        ring = self._ring(source, category)
+        if ring is None or count <= 0:
+            return []
+        header = self._header_offset(ring)
+        rows = []
+        self._lock(ring)
+        try:
+            write_seq, read_seq = RING_HEADER.unpack_from(self._map, header)
+            available = min(count, write_seq - read_seq)
+            for _ in range(max(available, 0)):
+                offset = self._slot_offset(ring, read_seq)
+                (length,) = SLOT_LENGTH.unpack_from(self._map, offset)
+                rows.append(self._map[offset + SLOT_LENGTH.size:offset + SLOT_LENGTH.size + length])
+                read_seq += 1
+            RING_HEADER.pack_into(self._map, header, write_seq, read_seq)
+        finally:
+            self._unlock(ring)
+
+        gifs = []
+        for row in rows:
+            try:
+                gifs.append(GifRecord.from_row(orjson.loads(row)))
+            except (orjson.JSONDecodeError, TypeError):
+                continue
+        return gifs
+
+    def take(self, count: int, sources: List[str], categories: List[str]) -> List[GifRecord]:
+        """Take up to count GIFs spread across the given sources and categories"""
+        ready = [
+            (source, category) for source in sources for category in categories
+            if self.depth(source, category) > 0
+        ]
+        gifs = []
+        while ready and len(gifs) < count:
+            key = ready.pop(sampling.randbelow(len(ready)))
+            share = -(-(count - len(gifs)) // (len(ready) + 1))
+            gifs += self.pop(*key, share)
+        return gifs
@@ -0,0 +1,38 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """Share one in-flight coroutine between concurrent callers with the same key"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn for key, or wait for the call already running for it"""
+        self.calls += 1
+        task = self._calls.get(key)
+        if task is not None:
+            self.collapsed += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+
+            def done(finished: asyncio.Future) -> None:
+                self._calls.pop(key, None)
+                # Retrieve the result so a call whose callers were all
+                # cancelled does not log "exception was never retrieved"
+                if not finished.cancelled():
+                    finished.exception()
+
+            task.add_done_callback(done)
+        # Shield so one cancelled caller does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._calls),
+        }
@@ -1,73 +1,88 @@
-import aiohttp
-from tenacity import retry, stop_after_attempt, wait_exponential
-from ..models.categories import CATEGORIES
 from ..core.config import get_settings
+from ..models.gif import GifRecord
+from .http import get_http_session
+from .cache import cache_provider_results
+from .categories import get_registry
+from .errors import RateLimitError
+from .ratelimit import acquire_quota
 import logging
 import asyncio
+from typing import Dict, Tuple
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-def get_category_terms(category_id):
-    category = next((cat for cat in CATEGORIES if cat["id"] == category_id), None)
-    return category["terms"] if category else ["anime"]
+# Tenor's `next` position for (query, offset) pairs reached by walking pages
+_positions: Dict[Tuple[str, int], str] = {}
+MAX_POSITIONS = 4096
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+def build_search_query(category):
+    return get_registry().get(category).tenor_query
+
+@cache_provider_results("tenor", settings.TENOR_CACHE_TTL, build_search_query)
 async def get_anime_gifs(limit=20, category="all", offset=0):
     if not settings.TENOR_API_KEY:
         logger.error("TENOR_API_KEY not found")
         return []
 
-    search_terms = get_category_terms(category) if category != "all" else ["anime"]
-    
+    query = build_search_query(category)
     params = {
         "key": settings.TENOR_API_KEY,
-        "q": " ".join(search_terms),
+        "q": query,
         "limit": limit,
-        "pos": str(offset),
+        "pos": _positions.get((query, offset), str(offset)),
         "media_filter": "gif,tinygif",
         "contentfilter": "medium",
     }
 
     try:
-        async with aiohttp.ClientSession() as session:
-            async with asyncio.timeout(5.0):
-                async with session.get(
-                    "https://tenor.googleapis.com/v2/search",
-                    params=params
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        raise Exception(f"Tenor API error: {response.status} - {error_text}")
+        await acquire_quota("tenor", settings.TENOR_API_KEY)
+        session = get_http_session()
+        async with asyncio.timeout(settings.PROVIDER_TIMEOUT):
+            async with session.get(
+                f"{settings.TENOR_API_URL}/search",
+                params=params
+            ) as response:
+                if response.status == 429:
+                    raise RateLimitError("Tenor API rate limited")
+                if response.status != 200:
+                    error_text = await response.text()
+                    raise Exception(f"Tenor API error: {response.status} - {error_text}")
+
+                data = await response.json()
+                
+                if not data.get("results"):
+                    return []
 
-                    data = await response.json()
-                    
-                    if not data.get("results"):
-                        return []
+                if data.get("next") and len(_positions) < MAX_POSITIONS:
+                    _positions[(query, offset + len(data["results"]))] = data["next"]
 
-                    gifs = []
-                    for result in data["results"]:
-                        try:
-                            gif_format = (
-                                result["media_formats"].get("gif") or 
-                                result["media_formats"].get("tinygif")
-                            )
-                            if gif_format:
-                                gifs.append({
-                                    "url": gif_format["url"],
-                                    "preview": gif_format["url"],
-                                    "size": gif_format.get("size"),
-                                    "dims": gif_format.get("dims"),
-                                    "source": "tenor",
-                                })
-                        except (KeyError, TypeError):
-                            continue
+                gifs = []
+                for result in data["results"]:
+                    try:
+                        gif_format = (
+                            result["media_formats"].get("gif") or 
+                            result["media_formats"].get("tinygif")
+                        )
+                        if gif_format:
+                            dims = gif_format.get("dims") or [None, None]
+                            gifs.append(GifRecord.create(
+                                url=gif_format["url"],
+                                source="tenor",
+                                category=category,
+                                size=gif_format.get("size"),
+                                width=dims[0],
+                                height=dims[1],
+                                preview=gif_format["url"],
+                            ))
+                    except (KeyError, TypeError, IndexError):
+                        continue
 
-                    return gifs
+                return gifs
 
     except asyncio.TimeoutError:
         logger.error("Timeout while fetching from Tenor API")
-        return []
+        raise
     except Exception as e:
         logger.error(f"Error fetching from Tenor API: {str(e)}")
         raise
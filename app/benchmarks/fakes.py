@@ -0,0 +1,267 @@
+"""
+Fake Tenor, Giphy, Reddit and Upstash REST servers for benchmarks.
+
+Each fake runs on an aiohttp test server, counts the requests it serves and
+can add latency, fail with 500s or answer 429 at configurable rates.
+"""
+import asyncio
+import hashlib
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+PAGE_DEPTH = 1000
+
+@dataclass
+class Behavior:
+    """Latency and failure profile of a fake upstream"""
+    latency_ms: float = 0
+    jitter_ms: float = 0
+    error_rate: float = 0
+    rate_limit_rate: float = 0
+
+    async def apply(self) -> Optional[web.Response]:
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return web.json_response({"error": "rate limited"}, status=429)
+        if roll < self.rate_limit_rate + self.error_rate:
+            return web.json_response({"error": "injected failure"}, status=500)
+        return None
+
+def _media_id(*parts: Any) -> str:
+    return hashlib.blake2b(":".join(map(str, parts)).encode(), digest_size=8).hexdigest()
+
+class FakeServer:
+    """Base class wiring an aiohttp application to a test server with counters"""
+
+    def __init__(self, behavior: Optional[Behavior] = None):
+        self.behavior = behavior or Behavior()
+        self.counts: Counter = Counter()
+        self.app = web.Application()
+        self.server: Optional[TestServer] = None
+
+    async def start(self) -> str:
+        self.server = TestServer(self.app, host="127.0.0.1")
+        await self.server.start_server()
+        return str(self.server.make_url("")).rstrip("/")
+
+    async def close(self) -> None:
+        if self.server:
+            await self.server.close()
+
+    @property
+    def calls(self) -> int:
+        return sum(self.counts.values())
+
+class FakeTenor(FakeServer):
+    def __init__(self, behavior: Optional[Behavior] = None):
+        super().__init__(behavior)
+        self.app.router.add_get("/v2/search", self.search)
+
+    async def search(self, request: web.Request) -> web.Response:
+        self.counts["search"] += 1
+        failure = await self.behavior.apply()
+        if failure:
+            return failure
+        query = request.query.get("q", "")
+        limit = int(request.query.get("limit", 20))
+        pos = int(request.query.get("pos") or 0)
+        results = [{
+            "media_formats": {"gif": {
+                "url": f"https://media.tenor.com/{_media_id('tenor', query, i)}AAAAC/fake.gif",
+                "size": 400000 + i,
+                "dims": [498, 280],
+            }}
+        } for i in range(pos, min(pos + limit, PAGE_DEPTH))]
+        return web.json_response({"results": results, "next": str(pos + len(results))})
+
+class FakeGiphy(FakeServer):
+    def __init__(self, behavior: Optional[Behavior] = None):
+        super().__init__(behavior)
+        self.app.router.add_get("/v1/gifs/search", self.search)
+
+    async def search(self, request: web.Request) -> web.Response:
+        self.counts["search"] += 1
+        failure = await self.behavior.apply()
+        if failure:
+            return failure
+        query = request.query.get("q", "")
+        limit = int(request.query.get("limit", 25))
+        offset = int(request.query.get("offset") or 0)
+        data = [{
+            "images": {"original": {
+                "url": f"https://media.giphy.com/media/{_media_id('giphy', query, i)}/giphy.gif",
+                "size": str(600000 + i),
+                "width": "480",
+                "height": "270",
+            }}
+        } for i in range(offset, min(offset + limit, PAGE_DEPTH))]
+        return web.json_response({
+            "data": data,
+            "pagination": {"offset": offset, "count": len(data), "total_count": PAGE_DEPTH},
+        })
+
+class FakeReddit(FakeServer):
+    """Serves both the OAuth token endpoint and subreddit listings"""
+
+    def __init__(self, behavior: Optional[Behavior] = None):
+        super().__init__(behavior)
+        self.app.router.add_post("/api/v1/access_token", self.token)
+        self.app.router.add_get("/r/{subreddit}/hot", self.hot)
+
+    async def token(self, request: web.Request) -> web.Response:
+        self.counts["token"] += 1
+        return web.json_response({
+            "access_token": "fake-token",
+            "expires_in": 86400,
+            "scope": "*",
+            "token_type": "bearer",
+        })
+
+    async def hot(self, request: web.Request) -> web.Response:
+        self.counts["listing"] += 1
+        failure = await self.behavior.apply()
+        if failure:
+            return failure
+        subreddit = request.match_info["subreddit"]
+        limit = min(int(request.query.get("limit", 25)), 100)
+        children = []
+        for i in range(limit):
+            post_id = _media_id("reddit", subreddit, i)[:7]
+            children.append({"kind": "t3", "data": {
+                "id": post_id,
+                "name": f"t3_{post_id}",
+                "title": f"{subreddit} post {i}",
+                "url": f"https://i.redd.it/{post_id}.gif",
+                "subreddit": subreddit,
+            }})
+        return web.json_response({"kind": "Listing", "data": {
+            "children": children, "after": None, "before": None,
+        }})
+
+class FakeUpstash(FakeServer):
+    """In-memory subset of the Upstash REST API used by the services"""
+
+    def __init__(self, behavior: Optional[Behavior] = None):
+        super().__init__(behavior)
+        self.data: Dict[str, Any] = {}
+        self.expires: Dict[str, float] = {}
+        self.app.router.add_post("/", self.command)
+        self.app.router.add_post("/pipeline", self.pipeline)
+        self.app.router.add_post("/multi-exec", self.pipeline)
+
+    async def command(self, request: web.Request) -> web.Response:
+        self.counts["command"] += 1
+        failure = await self.behavior.apply()
+        if failure:
+            return failure
+        return web.json_response(self._run(await request.json()))
+
+    async def pipeline(self, request: web.Request) -> web.Response:
+        self.counts[request.path.strip("/")] += 1
+        failure = await self.behavior.apply()
+        if failure:
+            return failure
+        return web.json_response([self._run(command) for command in await request.json()])
+
+    def _get(self, key: str) -> Any:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def _expire(self, key: str, seconds: float) -> None:
+        if key in self.data:
+            self.expires[key] = time.monotonic() + seconds
+
+    def _run(self, command: List[str]) -> Dict[str, Any]:
+        name, args = command[0].upper(), command[1:]
+        try:
+            return {"result": getattr(self, f"_cmd_{name.lower().replace('-', '_')}")(*args)}
+        except AttributeError:
+            return {"error": f"ERR unknown command '{name}'"}
+
+    def _cmd_get(self, key):
+        value = self._get(key)
+        return value if isinstance(value, str) else None
+
+    def _cmd_set(self, key, value, *options):
+        options = [option.upper() for option in options]
+        if "NX" in options and self._get(key) is not None:
+            return None
+        self.data[key] = value
+        self.expires.pop(key, None)
+        if "EX" in options:
+            self._expire(key, float(options[options.index("EX") + 1]))
+        return "OK"
+
+    def _cmd_setex(self, key, seconds, value):
+        self.data[key] = value
+        self._expire(key, float(seconds))
+        return "OK"
+
+    def _cmd_del(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    def _cmd_expire(self, key, seconds):
+        self._expire(key, float(seconds))
+        return int(key in self.data)
+
+    def _cmd_scan(self, cursor, *options):
+        pattern = options[options.index("MATCH") + 1] if "MATCH" in options else "*"
+        prefix = pattern.rstrip("*")
+        return ["0", [key for key in list(self.data) if key.startswith(prefix)]]
+
+    def _cmd_rpush(self, key, *values):
+        items = self._get(key)
+        if not isinstance(items, list):
+            items = self.data[key] = []
+        items.extend(values)
+        return len(items)
+
+    def _cmd_lpop(self, key, count=None):
+        items = self._get(key)
+        if not isinstance(items, list) or not items:
+            return None
+        if count is None:
+            return items.pop(0)
+        popped, self.data[key] = items[:int(count)], items[int(count):]
+        return popped
+
+    def _cmd_sadd(self, key, *members):
+        items = self._get(key)
+        if not isinstance(items, set):
+            items = self.data[key] = set()
+        before = len(items)
+        items.update(members)
+        return len(items) - before
+
+    def _cmd_scard(self, key):
+        items = self._get(key)
+        return len(items) if isinstance(items, set) else 0
+
+    def _cmd_eval(self, script, numkeys, *args):
+        keys, argv = args[:int(numkeys)], args[int(numkeys):]
+        if "SADD" in script:
+            # MARK_SEEN_SCRIPT: ARGV = ex, max_size, members...
+            fresh = [self._cmd_sadd(keys[0], member) for member in argv[2:]]
+            if not any(fresh) and self._cmd_scard(keys[0]) > int(argv[1]):
+                self._cmd_del(keys[0])
+                return fresh + [1]
+            self._expire(keys[0], float(argv[0]))
+            return fresh + [0]
+        if "'GET'" in script:
+            # Leader lock RENEW_SCRIPT / RELEASE_SCRIPT: act only while the token matches
+            if self._cmd_get(keys[0]) != argv[0]:
+                return 0
+            return self._cmd_del(keys[0]) if "'DEL'" in script else self._cmd_expire(keys[0], argv[1])
+        # TOKEN_BUCKET_SCRIPT: never throttle, quotas are exercised by the 429 rate
+        return 0
@@ -0,0 +1,87 @@
+"""
+Count new TCP connections per upstream request, before and after the shared session.
+
+Run from the app directory:
+    python -m benchmarks.http_handshakes --requests 200
+"""
+import argparse
+import asyncio
+import time
+import aiohttp
+from aiohttp import web
+from api.services.http import start_http_session, close_http_session
+
+async def handle(request: web.Request) -> web.Response:
+    return web.json_response({"result": "OK"})
+
+def connection_tracer(counters: dict) -> aiohttp.TraceConfig:
+    async def on_create(session, ctx, params):
+        counters["created"] += 1
+
+    async def on_reuse(session, ctx, params):
+        counters["reused"] += 1
+
+    trace = aiohttp.TraceConfig()
+    trace.on_connection_create_end.append(on_create)
+    trace.on_connection_reuseconn.append(on_reuse)
+    return trace
+
+async def per_call_sessions(url: str, requests: int, concurrency: int) -> dict:
+    """Previous behaviour: one ClientSession per upstream call"""
+    counters = {"created": 0, "reused": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call():
+        async with semaphore:
+            async with aiohttp.ClientSession(trace_configs=[connection_tracer(counters)]) as session:
+                async with session.get(url) as response:
+                    await response.read()
+
+    await asyncio.gather(*(call() for _ in range(requests)))
+    return counters
+
+async def shared_session(url: str, requests: int, concurrency: int) -> dict:
+    """Current behaviour: the application-scoped session"""
+    counters = {"created": 0, "reused": 0}
+    semaphore = asyncio.Semaphore(concurrency)
+    session = await start_http_session(trace_configs=[connection_tracer(counters)])
+
+    async def call():
+        async with semaphore:
+            async with session.get(url) as response:
+                await response.read()
+
+    try:
+        await asyncio.gather(*(call() for _ in range(requests)))
+    finally:
+        await close_http_session()
+    return counters
+
+async def main(requests: int, concurrency: int) -> None:
+    app = web.Application()
+    app.router.add_get("/", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    url = f"http://127.0.0.1:{port}/"
+
+    try:
+        for name, bench in (("per-call", per_call_sessions), ("shared", shared_session)):
+            start = time.perf_counter()
+            counters = await bench(url, requests, concurrency)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:>8}: {counters['created'] / requests:.3f} handshakes/request, "
+                f"{counters['reused']} reused, {elapsed * 1000 / requests:.3f} ms/request"
+            )
+    finally:
+        await runner.cleanup()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,245 @@
+"""
+Drive /api/random and /api/batch at a fixed rate against fake upstreams.
+
+Starts fake Tenor, Giphy, Reddit and Upstash servers, runs the app under
+uvicorn in a subprocess pointed at them, sends an open-loop request stream and
+reports latency percentiles, upstream calls per request and app CPU per request.
+
+Run from the app directory:
+    python -m benchmarks.load --qps 50 --duration 20 --upstream-latency-ms 80
+    python -m benchmarks.load --endpoint batch --count 10 --env POOL_ENABLED=false
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+import aiohttp
+import orjson
+from benchmarks.fakes import Behavior, FakeGiphy, FakeReddit, FakeTenor, FakeUpstash
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def process_cpu_seconds(pid: int) -> Optional[float]:
+    """User plus system CPU time of a process, from /proc where available"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, IndexError, ValueError):
+        return None
+
+def tree_cpu_seconds(pid: int) -> Optional[float]:
+    """CPU time of a process and its children, so multi-worker runs count every worker"""
+    total = process_cpu_seconds(pid)
+    if total is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except (OSError, ValueError):
+        return total
+    return total + sum(tree_cpu_seconds(child) or 0 for child in children)
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+def start_app(
+    port: int, urls: Dict[str, str], extra_env: Dict[str, str], workdir: str, workers: int = 1
+) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "TENOR_API_KEY": "bench",
+        "GIPHY_API_KEY": "bench",
+        "REDDIT_CLIENT_ID": "bench",
+        "REDDIT_CLIENT_SECRET": "bench",
+        "UPSTASH_REDIS_REST_TOKEN": "bench",
+        "UPSTASH_REDIS_REST_URL": urls["upstash"],
+        "TENOR_API_URL": f"{urls['tenor']}/v2",
+        "GIPHY_API_URL": f"{urls['giphy']}/v1",
+        "REDDIT_OAUTH_URL": urls["reddit"],
+        "REDDIT_URL": urls["reddit"],
+        "CATALOG_PATH": os.path.join(workdir, "catalog.db"),
+        "LEADER_LOCK_PATH": os.path.join(workdir, "leader.lock"),
+        "SHARED_POOL_PATH": os.path.join(workdir, "shared_pool.mmap"),
+        "WORKERS": str(workers),
+        "INBOUND_RATE_LIMIT": "1000000",
+        "INBOUND_RATE_BURST": "1000000",
+        **extra_env,
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+         "--workers", str(workers)],
+        cwd=APP_DIR, env=env,
+    )
+
+async def wait_ready(session: aiohttp.ClientSession, base_url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{base_url}/api/categories") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("App did not become ready")
+
+def request_paths(endpoint: str, count: int, category: Optional[str]) -> List[str]:
+    random_path = f"/api/random?category={category}" if category else "/api/random"
+    batch_path = f"/api/batch?count={count}&category={category}" if category else f"/api/batch?count={count}"
+    return {"random": [random_path], "batch": [batch_path], "mixed": [random_path, batch_path]}[endpoint]
+
+async def drive(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    paths: List[str],
+    qps: float,
+    duration: float,
+) -> Dict:
+    """
+    Open-loop load: request i is sent at start + i / qps whether or not earlier
+    ones finished. Latency is measured from the scheduled send time, so queueing
+    inside the app is not hidden by a slow client.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    tasks = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    total = int(qps * duration)
+
+    async def one(path: str, scheduled: float) -> None:
+        try:
+            async with session.get(f"{base_url}{path}") as response:
+                await response.read()
+                statuses[response.status] += 1
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            statuses[type(e).__name__] += 1
+            return
+        latencies.append(loop.time() - scheduled)
+
+    for i in range(total):
+        scheduled = start + i / qps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(paths[i % len(paths)], scheduled)))
+    await asyncio.gather(*tasks)
+    return {"latencies": latencies, "statuses": statuses, "sent": total}
+
+def fake_calls(fakes: Dict[str, object]) -> Dict[str, int]:
+    calls = {name: fake.calls for name, fake in fakes.items()}
+    calls["reddit"] -= fakes["reddit"].counts["token"]
+    return calls
+
+async def run(args: argparse.Namespace) -> Dict:
+    upstream = Behavior(
+        args.upstream_latency_ms, args.upstream_jitter_ms,
+        args.upstream_error_rate, args.upstream_429_rate,
+    )
+    fakes = {
+        "tenor": FakeTenor(upstream),
+        "giphy": FakeGiphy(upstream),
+        "reddit": FakeReddit(upstream),
+        "upstash": FakeUpstash(Behavior(args.redis_latency_ms, args.redis_jitter_ms)),
+    }
+    urls = {name: await fake.start() for name, fake in fakes.items()}
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = start_app(port, urls, extra_env, workdir, args.workers)
+        connector = aiohttp.TCPConnector(limit=0)
+        timeout = aiohttp.ClientTimeout(total=args.timeout)
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                await wait_ready(session, base_url)
+                paths = request_paths(args.endpoint, args.count, args.category)
+                if args.warmup > 0:
+                    await drive(session, base_url, paths, args.qps, args.warmup)
+
+                calls_before = fake_calls(fakes)
+                cpu_before = tree_cpu_seconds(app.pid)
+                result = await drive(session, base_url, paths, args.qps, args.duration)
+                cpu_after = tree_cpu_seconds(app.pid)
+                calls_after = fake_calls(fakes)
+        finally:
+            app.terminate()
+            try:
+                app.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                app.kill()
+            for fake in fakes.values():
+                await fake.close()
+
+    completed = max(len(result["latencies"]), 1)
+    calls = {name: calls_after[name] - calls_before[name] for name in calls_after}
+    return {
+        "endpoint": args.endpoint,
+        "qps": args.qps,
+        "sent": result["sent"],
+        "completed": len(result["latencies"]),
+        "statuses": {str(k): v for k, v in result["statuses"].items()},
+        "latency_ms": {
+            f"p{pct}": round(percentile(result["latencies"], pct) * 1000, 2)
+            for pct in (50, 95, 99)
+        },
+        "upstream_calls_per_request": round(
+            (calls["tenor"] + calls["giphy"] + calls["reddit"]) / completed, 3
+        ),
+        "calls_per_request": {name: round(count / completed, 3) for name, count in calls.items()},
+        "cpu_ms_per_request": (
+            round((cpu_after - cpu_before) * 1000 / completed, 3)
+            if cpu_before is not None and cpu_after is not None else None
+        ),
+    }
+
+def report(results: Dict) -> None:
+    latency = results["latency_ms"]
+    print(f"endpoint: {results['endpoint']} at {results['qps']} qps")
+    print(f"requests: {results['completed']}/{results['sent']} completed, statuses {results['statuses']}")
+    print(f" latency: p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms")
+    print(f"upstream: {results['upstream_calls_per_request']} calls/request {results['calls_per_request']}")
+    cpu = results["cpu_ms_per_request"]
+    print(f"     cpu: {'n/a' if cpu is None else f'{cpu} ms/request'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoint", choices=["random", "batch", "mixed"], default="mixed")
+    parser.add_argument("--qps", type=float, default=20)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--count", type=int, default=10, help="GIFs per batch request")
+    parser.add_argument("--category", help="category to request, default all")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=50)
+    parser.add_argument("--upstream-error-rate", type=float, default=0)
+    parser.add_argument("--upstream-429-rate", type=float, default=0)
+    parser.add_argument("--redis-latency-ms", type=float, default=5)
+    parser.add_argument("--redis-jitter-ms", type=float, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE passed to the app")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    results = asyncio.run(run(args))
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
+    else:
+        report(results)
@@ -0,0 +1,99 @@
+"""
+Compare the previous secrets-based shuffles with the batched-entropy sampler.
+
+Cases mirror the request path: picking count GIFs out of everything a fan-out
+gathered, shuffling a provider page into a buffer, ordering weighted
+(source, category) candidates for the planner and picking catalog rows.
+
+Run from the app directory:
+    python -m benchmarks.sampling --items 60 --count 10 --rounds 20000
+"""
+import argparse
+import secrets
+import time
+from collections import Counter
+from typing import Callable, List
+from api.services.sampling import SecureSampler
+
+def secure_shuffle(items: List) -> List:
+    """Previous behaviour: full Fisher-Yates with one secrets call per element"""
+    items = items.copy()
+    for i in range(len(items) - 1, 0, -1):
+        j = secrets.randbelow(i + 1)
+        items[i], items[j] = items[j], items[i]
+    return items
+
+def weighted_order(items: List, weights: List[float]) -> List:
+    """Previous behaviour: Efraimidis-Spirakis keys from secrets.randbits"""
+    keyed = []
+    for item, weight in zip(items, weights):
+        if weight > 0:
+            u = (secrets.randbits(53) + 1) / (1 << 53)
+            keyed.append((u ** (1 / weight), item))
+    keyed.sort(key=lambda pair: pair[0], reverse=True)
+    return [item for _, item in keyed]
+
+def rejection_pick(total: int, count: int) -> set:
+    """Previous catalog behaviour: draw indices until enough distinct ones"""
+    picked = set()
+    for _ in range(min(count * 3, total * 3)):
+        if len(picked) >= min(count, total):
+            break
+        picked.add(secrets.randbelow(total))
+    return picked
+
+def bench(fn: Callable[[], object], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds
+
+def report(name: str, old: float, new: float) -> None:
+    print(f"{name:>22}: {old * 1e6:8.2f} us -> {new * 1e6:7.2f} us ({old / new:.1f}x faster)")
+
+def check_uniform(sampler: SecureSampler, items: int, count: int, rounds: int) -> float:
+    """Largest relative deviation of per-item pick frequency from uniform"""
+    counts = Counter()
+    for _ in range(rounds):
+        picked = sampler.sample(range(items), count)
+        assert len(set(picked)) == len(picked) == min(count, items)
+        counts.update(picked)
+    expected = rounds * min(count, items) / items
+    return max(abs(counts[i] - expected) / expected for i in range(items))
+
+def main(items: int, count: int, catalog: int, rounds: int) -> None:
+    sampler = SecureSampler()
+    gifs = list(range(items))
+    candidates = [(source, category) for source in ("tenor", "giphy", "reddit") for category in range(12)]
+    weights = [0.5 + (i % 7) / 3 for i in range(len(candidates))]
+
+    report(
+        f"pick {count} of {items}",
+        bench(lambda: secure_shuffle(gifs)[:count], rounds),
+        bench(lambda: sampler.partition(gifs, count), rounds),
+    )
+    report(
+        f"shuffle {items}",
+        bench(lambda: secure_shuffle(gifs), rounds),
+        bench(lambda: sampler.shuffle(gifs), rounds),
+    )
+    report(
+        f"weighted {len(candidates)} keys",
+        bench(lambda: weighted_order(candidates, weights), rounds),
+        bench(lambda: sampler.weighted_sample(candidates, weights), rounds),
+    )
+    report(
+        f"catalog {count} of {catalog}",
+        bench(lambda: rejection_pick(catalog, count), rounds),
+        bench(lambda: sampler.sample(range(catalog), count), rounds),
+    )
+    print(f"max deviation from uniform over {rounds} samples: {check_uniform(sampler, items, count, rounds):.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=60, help="GIFs gathered by a fan-out")
+    parser.add_argument("--count", type=int, default=10, help="GIFs a request needs")
+    parser.add_argument("--catalog", type=int, default=100000, help="catalog rows to pick from")
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.items, args.count, args.catalog, args.rounds)
@@ -0,0 +1,137 @@
+"""
+Measure throughput as the number of uvicorn workers grows.
+
+For each worker count the app is started against fresh fake upstreams with
+WORKERS set, so one elected leader harvests and refills while every worker
+serves from the shared ring. A closed loop of concurrent clients then sends
+requests as fast as the app answers them and the achieved requests per second
+and latency percentiles are reported.
+
+Run from the app directory:
+    python -m benchmarks.scaling --workers 1 2 4 --concurrency 64 --duration 15
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import tempfile
+from collections import Counter
+from typing import Dict, List
+import aiohttp
+import orjson
+from benchmarks.fakes import Behavior, FakeGiphy, FakeReddit, FakeTenor, FakeUpstash
+from benchmarks.load import free_port, percentile, request_paths, start_app, wait_ready
+
+async def saturate(
+    session: aiohttp.ClientSession,
+    base_url: str,
+    paths: List[str],
+    concurrency: int,
+    duration: float,
+) -> Dict:
+    """Closed-loop load: each client sends its next request as soon as the last one returns"""
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def client(index: int) -> None:
+        i = index
+        while loop.time() < deadline:
+            started = loop.time()
+            try:
+                async with session.get(f"{base_url}{paths[i % len(paths)]}") as response:
+                    await response.read()
+                    statuses[response.status] += 1
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                statuses[type(e).__name__] += 1
+                continue
+            finally:
+                i += 1
+            latencies.append(loop.time() - started)
+
+    started = loop.time()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return {"latencies": latencies, "statuses": statuses, "elapsed": loop.time() - started}
+
+async def run_workers(args: argparse.Namespace, workers: int) -> Dict:
+    upstream = Behavior(args.upstream_latency_ms, args.upstream_jitter_ms)
+    fakes = {
+        "tenor": FakeTenor(upstream),
+        "giphy": FakeGiphy(upstream),
+        "reddit": FakeReddit(upstream),
+        "upstash": FakeUpstash(Behavior(args.redis_latency_ms, args.redis_jitter_ms)),
+    }
+    urls = {name: await fake.start() for name, fake in fakes.items()}
+    extra_env = dict(item.split("=", 1) for item in args.env)
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        app = start_app(port, urls, extra_env, workdir, workers)
+        connector = aiohttp.TCPConnector(limit=0)
+        timeout = aiohttp.ClientTimeout(total=args.timeout)
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                await wait_ready(session, base_url)
+                paths = request_paths(args.endpoint, args.count, args.category)
+                if args.warmup > 0:
+                    await saturate(session, base_url, paths, args.concurrency, args.warmup)
+                result = await saturate(session, base_url, paths, args.concurrency, args.duration)
+        finally:
+            app.terminate()
+            try:
+                app.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                app.kill()
+            for fake in fakes.values():
+                await fake.close()
+
+    completed = len(result["latencies"])
+    return {
+        "workers": workers,
+        "completed": completed,
+        "statuses": {str(k): v for k, v in result["statuses"].items()},
+        "rps": round(completed / result["elapsed"], 1),
+        "latency_ms": {
+            f"p{pct}": round(percentile(result["latencies"], pct) * 1000, 2)
+            for pct in (50, 99)
+        },
+    }
+
+async def run(args: argparse.Namespace) -> List[Dict]:
+    return [await run_workers(args, workers) for workers in args.workers]
+
+def report(results: List[Dict]) -> None:
+    baseline = results[0]["rps"] or 1
+    print(f"cpus: {os.cpu_count()}")
+    print(f"{'workers':>7} {'rps':>9} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8}  statuses")
+    for result in results:
+        latency = result["latency_ms"]
+        print(
+            f"{result['workers']:>7} {result['rps']:>9} {result['rps'] / baseline:>7.2f}x "
+            f"{latency['p50']:>8} {latency['p99']:>8}  {result['statuses']}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--endpoint", choices=["random", "batch", "mixed"], default="mixed")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--count", type=int, default=10, help="GIFs per batch request")
+    parser.add_argument("--category", help="category to request, default all")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=50)
+    parser.add_argument("--redis-latency-ms", type=float, default=1)
+    parser.add_argument("--redis-jitter-ms", type=float, default=1)
+    parser.add_argument("--env", action="append", default=[], help="KEY=VALUE passed to the app")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+    results = asyncio.run(run(args))
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
+    else:
+        report(results)
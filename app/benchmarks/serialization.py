@@ -0,0 +1,63 @@
+"""
+Compare per-item cost of the Pydantic response path with the orjson fast path.
+
+Run from the app directory:
+    python -m benchmarks.serialization --items 50 --rounds 2000
+"""
+import argparse
+import json
+import time
+import orjson
+from api.core.responses import gif_payload
+from api.models.gif import GifRecord
+from api.models.schemas import BatchResponse
+
+def make_gifs(count: int) -> list:
+    gifs = []
+    for i in range(count):
+        url = f"https://media.tenor.com/{i:012d}AAAAC/anime.gif"
+        gifs.append(GifRecord.create(
+            url=url, source="tenor", size=512000 + i, width=498, height=280
+        ))
+    return gifs
+
+def pydantic_path(gifs: list, category: str) -> bytes:
+    """Previous behaviour: build dicts, validate through BatchResponse, encode"""
+    model = BatchResponse(success=True, data=[{
+        "id": gif.id,
+        "url": gif.url,
+        "size": gif.size,
+        "dims": gif.dims,
+        "source": gif.source,
+        "category": category
+    } for gif in gifs])
+    return json.dumps(model.model_dump()).encode()
+
+def fast_path(gifs: list, category: str) -> bytes:
+    """Current behaviour: pre-normalized records straight to orjson bytes"""
+    return orjson.dumps({
+        "success": True,
+        "data": [gif_payload(gif, category) for gif in gifs],
+        "error": None
+    })
+
+def bench(fn, gifs: list, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(gifs, "all")
+    return (time.perf_counter() - start) / (rounds * len(gifs))
+
+def main(items: int, rounds: int) -> None:
+    gifs = make_gifs(items)
+    assert orjson.loads(pydantic_path(gifs, "all")) == orjson.loads(fast_path(gifs, "all"))
+    slow = bench(pydantic_path, gifs, rounds)
+    fast = bench(fast_path, gifs, rounds)
+    print(f"pydantic: {slow * 1e6:.3f} us/item")
+    print(f"  orjson: {fast * 1e6:.3f} us/item ({slow / fast:.1f}x faster)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.items, args.rounds)
@@ -1,14 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import batch, random, categories
+from api.routes import batch, random, categories, admin, metrics
+from api.core.middleware import LoadSheddingMiddleware
+from api.services.gif_manager import get_gif_manager
+from api.services.http import start_http_session, close_http_session
+from api.services.metrics import start_loop_monitor, stop_loop_monitor
+from api.services.reddit import close_reddit
+from api.core.config import get_settings
 import logging
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_session()
+    start_loop_monitor()
+    gif_manager = get_gif_manager()
+    await gif_manager.start()
+    try:
+        yield
+    finally:
+        await gif_manager.stop()
+        await close_reddit()
+        await close_http_session()
+        await stop_loop_monitor()
+
 app = FastAPI(
     title="ASCIIme API",
     description="API for fetching anime GIFs from various sources",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+app.add_middleware(LoadSheddingMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,9 +44,12 @@ app.add_middleware(
 app.include_router(batch.router, prefix="/api", tags=["batch"])
 app.include_router(random.router, prefix="/api", tags=["random"])
 app.include_router(categories.router, prefix="/api", tags=["categories"])
+app.include_router(admin.router, prefix="/api", tags=["admin"])
+app.include_router(metrics.router, tags=["metrics"])
 
 if __name__ == "__main__":
     import uvicorn
     logging.basicConfig(level=logging.INFO)
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    workers = get_settings().WORKERS
+    uvicorn.run("main:app" if workers > 1 else app, host="0.0.0.0", port=8000, workers=workers)
     
\ No newline at end of file